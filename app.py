@@ -1,9 +1,25 @@
 from dotenv import load_dotenv
-from groq import Groq
+import hmac
 import json
 import os
 import pickle
-from flask import Flask, render_template, request, jsonify
+import time
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
+from artifacts import list_versions, load_artifacts, set_current
+from cache import ExplanationCache, LRUCache
+from campaigns import CampaignIndex
+from cascade import Prefilter, TierStats
+from entities import ReputationStore, extract_entities
+from llm import CircuitBreaker, ExplanationService
+from metrics import Metrics
+from ratelimit import make_admission_gate, make_rate_limiter, retry_after_header
+from schema import (COMPRESSIBLE_MIMETYPES, compact_result, compress, parse_fields, parse_version, select_fields,
+                    static_document, wants_explanation)
+from online import FeedbackStore, OnlineLearner, label_from_answers
+from reasons import BLOCKLISTED_REASON, SHORTLINK_REASON
+from registry import ModelRegistry
+from scam_types import ScamTypeMatcher
+from scoring import ScoringEngine
 load_dotenv()
 
 app = Flask(__name__)
@@ -11,175 +27,123 @@ app = Flask(__name__)
 # ---------- Config ----------
 app.config["MODEL_PATH"] = os.path.join(app.root_path, "model.pkl")
 app.config["VECTORIZER_PATH"] = os.path.join(app.root_path, "vectorizer.pkl")
+app.config["ARTIFACTS_DIR"] = os.getenv("ARTIFACTS_DIR", os.path.join(app.root_path, "artifacts"))
+app.config["MODEL_WATCH_INTERVAL"] = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+app.config["ADMIN_TOKEN"] = os.getenv("ADMIN_TOKEN", "")
+# Explicit /api/feedback labels need this token (or ADMIN_TOKEN); they are
+# weighted up in online learning, so anonymous labels are refused.
+app.config["FEEDBACK_TOKEN"] = os.getenv("FEEDBACK_TOKEN", "")
+app.config["FEEDBACK_DB_PATH"] = os.getenv("FEEDBACK_DB_PATH", os.path.join(app.root_path, "feedback.db"))
+app.config["ONLINE_LEARNING"] = os.getenv("ONLINE_LEARNING", "0") == "1"
+app.config["ONLINE_STATE_DIR"] = os.getenv("ONLINE_STATE_DIR", os.path.join(app.root_path, "online"))
+app.config["ONLINE_BLEND_WEIGHT"] = float(os.getenv("ONLINE_BLEND_WEIGHT", "0.3"))
+app.config["ONLINE_TRAIN_INTERVAL"] = float(os.getenv("ONLINE_TRAIN_INTERVAL", "60"))
 app.config["DEBUG"] = os.getenv("FLASK_DEBUG", "0") == "1"
 app.config["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY", "")
+app.config["GROQ_BASE_URL"] = os.getenv("GROQ_BASE_URL", "")
+app.config["GROQ_MODEL"] = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+app.config["LLM_TIMEOUT"] = float(os.getenv("LLM_TIMEOUT", "8"))
+app.config["LLM_MAX_WORKERS"] = int(os.getenv("LLM_MAX_WORKERS", "4"))
+app.config["LLM_MAX_PENDING"] = int(os.getenv("LLM_MAX_PENDING", "16"))
+app.config["LLM_MAX_ASYNC"] = int(os.getenv("LLM_MAX_ASYNC", "64"))
+app.config["LLM_BREAKER_THRESHOLD"] = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+app.config["LLM_BREAKER_RESET"] = float(os.getenv("LLM_BREAKER_RESET", "30"))
+app.config["CACHE_CAPACITY"] = int(os.getenv("CACHE_CAPACITY", "4096"))
+app.config["CACHE_TTL"] = float(os.getenv("CACHE_TTL", "3600"))
+app.config["CACHE_DB_PATH"] = os.getenv("CACHE_DB_PATH", "")
+app.config["BATCH_MAX_MESSAGES"] = int(os.getenv("BATCH_MAX_MESSAGES", "1000"))
+app.config["BATCH_CHUNK_SIZE"] = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+app.config["METRICS_ENABLED"] = os.getenv("METRICS_ENABLED", "0") == "1"
+app.config["METRICS_PREFIX"] = os.getenv("METRICS_PREFIX", "coder_darji")
+app.config["CAMPAIGN_CAPACITY"] = int(os.getenv("CAMPAIGN_CAPACITY", "10000"))
+app.config["CAMPAIGN_CLUSTER_THRESHOLD"] = float(os.getenv("CAMPAIGN_CLUSTER_THRESHOLD", "0.5"))
+app.config["CAMPAIGN_REUSE_THRESHOLD"] = float(os.getenv("CAMPAIGN_REUSE_THRESHOLD", "0.9"))
+app.config["BLOCKLIST_PATH"] = os.getenv("BLOCKLIST_PATH", os.path.join(app.root_path, "blocklist.txt"))
+app.config["BLOCKLIST_BOOST"] = float(os.getenv("BLOCKLIST_BOOST", "0.35"))
+app.config["SHORTLINK_BOOST"] = float(os.getenv("SHORTLINK_BOOST", "0.05"))
+app.config["CASCADE_ENABLED"] = os.getenv("CASCADE_ENABLED", "0") == "1"
+app.config["CASCADE_CLEAR_BELOW"] = float(os.getenv("CASCADE_CLEAR_BELOW", "0.2"))
+app.config["LLM_MIN_RISK"] = os.getenv("LLM_MIN_RISK", "Low")
+app.config["RATE_LIMIT_PER_MINUTE"] = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+app.config["RATE_LIMIT_BURST"] = float(os.getenv("RATE_LIMIT_BURST", "30"))
+app.config["RATE_LIMIT_BACKEND"] = os.getenv("RATE_LIMIT_BACKEND", "memory")
+app.config["RATE_LIMIT_DB_PATH"] = os.getenv("RATE_LIMIT_DB_PATH", os.path.join(app.root_path, "ratelimit.db"))
+# Behind the platform router every request comes from the router's address,
+# so clients are told apart by the hop it appended to X-Forwarded-For.
+app.config["RATE_LIMIT_KEY_HEADER"] = os.getenv("RATE_LIMIT_KEY_HEADER", "X-Forwarded-For")
+app.config["RATE_LIMIT_TRUSTED_HOPS"] = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "1"))
+# With admission control on (LLM_MAX_INFLIGHT > 0) it replaces
+# LLM_MAX_WORKERS/LLM_MAX_PENDING as the bound on threaded LLM calls.
+app.config["LLM_MAX_INFLIGHT"] = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+app.config["LLM_MAX_QUEUE"] = int(os.getenv("LLM_MAX_QUEUE", "16"))
+app.config["LLM_QUEUE_TIMEOUT"] = float(os.getenv("LLM_QUEUE_TIMEOUT", "1"))
+app.config["LLM_ADMISSION_BACKEND"] = os.getenv("LLM_ADMISSION_BACKEND", "memory")
+app.config["LLM_ADMISSION_DIR"] = os.getenv("LLM_ADMISSION_DIR", os.path.join(app.root_path, "admission"))
+app.config["COMPRESS_MIN_SIZE"] = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+app.config["COMPRESS_LEVEL"] = int(os.getenv("COMPRESS_LEVEL", "6"))
+app.config["STATIC_MAX_AGE"] = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+
+# ---------- Metrics ----------
+metrics = Metrics(enabled=app.config["METRICS_ENABLED"], prefix=app.config["METRICS_PREFIX"])
+
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.request_seconds.observe(time.perf_counter() - started, endpoint)
+        metrics.requests.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+
+# ---------- Response compression ----------
+@app.after_request
+def compress_response(response):
+    if (app.config["COMPRESS_MIN_SIZE"] < 0 or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    body, encoding = compress(response.get_data(), request.headers.get("Accept-Encoding", ""),
+                              app.config["COMPRESS_MIN_SIZE"], app.config["COMPRESS_LEVEL"])
+    if encoding:
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+    return response
 
 
 # ---------- Load artifacts ----------
-model = None
-vectorizer = None
+def load_engine(path: str) -> ScoringEngine:
+    # Read-only memory maps: workers share the pages, nothing is unpickled.
+    model, vectorizer = load_artifacts(path)
+    return ScoringEngine(model, vectorizer)
 
-try:
+
+def load_pickled_engine():
     with open(app.config["MODEL_PATH"], "rb") as f:
         model = pickle.load(f)
     with open(app.config["VECTORIZER_PATH"], "rb") as f:
         vectorizer = pickle.load(f)
-    print("✓ Model and vectorizer loaded successfully")
+    return "pickle", ScoringEngine(model, vectorizer)
+
+
+registry = ModelRegistry(app.config["ARTIFACTS_DIR"], load_engine, fallback=load_pickled_engine)
+
+try:
+    registry.reload()
+    print(f"✓ Model and vectorizer loaded successfully (version {registry.version})")
 except Exception as exc:
     print(f"✗ Error loading model/vectorizer: {exc}")
-    model = None
-    vectorizer = None
-
-
-# ---------- Word reason map ----------
-WORD_REASONS = {
-    # Urgency / pressure
-    "urgent": "Creates urgency to pressure quick action",
-    "immediately": "Pressures you to act without thinking",
-    "limited": "Fake scarcity to force fast decisions",
-    "expire": "Urgency tactic — fear of missing out",
-    "hurry": "Pressure tactic to bypass rational thinking",
-    "asap": "Urgency language to prevent you from thinking clearly",
-    "now": "Immediate action pressure — classic manipulation tactic",
-    "today": "Time pressure to force hasty decisions",
-    "deadline": "Artificial deadline to create panic",
-
-    # Money / rewards
-    "bonus": "Promise of extra money is a common lure",
-    "offer": "Vague offer language used to attract victims",
-    "prize": "Classic prize/lottery scam signal",
-    "won": "Fake winning claims to bait victims",
-    "free": "Too-good-to-be-true free offer tactic",
-    "cash": "Direct money mention to lure victims",
-    "reward": "Reward promises used as bait",
-    "earn": "Unrealistic earning claims attract victims",
-    "salary": "Fake salary promises in job scams",
-    "commission": "Common word in fake job/task scams",
-    "daily": "Promises of daily earnings — task/job scam signal",
-    "income": "Fake income promise to attract victims",
-    "payment": "Payment mention to build false legitimacy",
-    "refund": "Fake refund used to steal banking details",
-    "cashback": "Fake cashback to steal account info",
-    "money": "Direct money mention — financial scam signal",
-    "transfer": "Money transfer request — common in fraud",
-    "deposit": "Deposit request before receiving reward — scam tactic",
-    "withdrawal": "Withdrawal mention to make scam feel real",
-    "profit": "Profit promise — common in investment scams",
-    "investment": "Fake investment pitch — financial scam signal",
-    "guaranteed": "No legitimate offer guarantees returns",
-    "returns": "Guaranteed returns promise — investment scam signal",
-
-    # Numbers (often money amounts)
-    "200": "Specific amount used to make fake offer feel real",
-    "500": "Specific amount used to make fake offer feel real",
-    "800": "Money amount — common in fake job/task offers",
-    "1000": "Round number promise typical in task scams",
-    "5000": "Large amount promise used as bait",
-    "450": "Specific amount used to make fake offer feel credible",
-    "100": "Small amount to seem low-risk and enticing",
-    "2000": "Money amount — common bait in task/job scams",
-    "10000": "Large sum promise — high-value scam bait",
-
-    # Contact / communication
-    "contact": "Asking you to contact — may lead to info harvesting",
-    "whatsapp": "Moves conversation off-platform to avoid detection",
-    "telegram": "Unofficial channel — common in scam recruitment",
-    "click": "Directing to click a link — phishing risk",
-    "link": "External link — potential phishing page",
-    "call": "Unsolicited call request — social engineering risk",
-    "phone": "Phone number request or call — social engineering tactic",
-    "number": "Requesting a number — often used to escalate contact",
-    "reply": "Reply pressure — used to initiate scam conversation",
-    "pm": "Private message request — tries to move you off public channels",
-    "dm": "Direct message to avoid scrutiny — common scam tactic",
-    "text": "Text-based contact — used to initiate phishing chain",
-
-    # Account / credentials
-    "otp": "OTP request is a major red flag — never share",
-    "pin": "PIN request — banks never ask for this",
-    "password": "Password request — always a red flag",
-    "verify": "Fake verification used to steal credentials",
-    "kyc": "KYC used as a pretext to harvest identity info",
-    "account": "Account mention to build false legitimacy",
-    "login": "Login request outside official app is suspicious",
-    "access": "Requesting access to your account or device — major red flag",
-    "credentials": "Credential request — identity theft risk",
-    "details": "Asking for personal details — data harvesting attempt",
-    "information": "Requesting personal information — phishing signal",
-    "identity": "Identity-related request — potential ID fraud",
-    "bank": "Bank mention — financial phishing signal",
-    "card": "Card details request — payment fraud risk",
-    "cvv": "CVV request — banks never ask for this, always a scam",
-
-    # Apps / tech
-    "app": "App download request — could be malicious software",
-    "download": "Download request — risk of malware or spyware",
-    "install": "Install request — potential malicious app",
-    "apk": "APK install request — major red flag, bypasses app store safety",
-    "software": "Software install — could be used for remote access",
-    "remote": "Remote access request — scammers use this to control your device",
-
-    # Social engineering
-    "friend": "Impersonating a friend or mutual contact — social engineering",
-    "family": "Family impersonation — emotional manipulation tactic",
-    "help": "Fake help request — used to create emotional urgency",
-    "emergency": "Fake emergency to bypass rational thinking",
-    "trust": "Overemphasis on trust — common manipulation signal",
-    "safe": "False safety assurance to lower your guard",
-    "legit": "Overasserting legitimacy — scammers often do this",
-    "official": "Fake official claim — impersonation red flag",
-    "government": "Government impersonation — authority-based scam",
-    "winner": "Fake winner announcement — lottery/prize scam",
-    "selected": "Fake selection claim — lottery/job scam signal",
-    "congratulations": "Classic scam opener for prize/lottery fraud",
-    "exclusive": "Exclusivity claim to make victim feel special",
-    "special": "Special offer language — bait tactic",
-
-    # Job / task scams
-    "job": "Unsolicited job offer — common scam vector",
-    "hiring": "Fake hiring message to harvest personal data",
-    "task": "Task-based scam — victims paid small amounts first, then defrauded",
-    "training": "Fake training to make scam seem legitimate",
-    "apply": "Apply now pressure — fake job scam tactic",
-    "vacancy": "Fake vacancy listing — recruitment scam signal",
-    "interview": "Fake interview invite — used to harvest personal info",
-    "work": "Work from home or part-time work offer — scam signal",
-    "part": "Part-time offer language — task scam signal",
-    "home": "Work from home promise — common in task scams",
-
-    # Delivery scams
-    "parcel": "Fake parcel alert to steal delivery fees or info",
-    "delivery": "Fake delivery notification — phishing signal",
-    "shipment": "Fake shipment used to harvest personal details",
-    "customs": "Fake customs fee demand — common delivery scam",
-    "courier": "Fake courier message to steal payment details",
-    "package": "Fake package notification — delivery phishing",
-    "address": "Address request — identity or delivery scam signal",
-
-    # Generic scam language
-    "videos": "Vague task content (e.g. like videos) — task scam signal",
-    "hotels": "Vague task content (e.g. rate hotels) — task scam signal",
-    "survey": "Fake survey used to harvest personal info",
-    "subscription": "Fake subscription charge — billing scam signal",
-    "charge": "Unexpected charge claim — billing fraud tactic",
-    "cancel": "Cancel subscription urgency — billing scam pressure",
-    "activate": "Fake activation request — phishing tactic",
-    "confirm": "Confirmation request — used to verify active targets",
-    "update": "Fake update request — credential phishing signal",
-}
-
-
-def get_word_reason(word: str) -> str:
-    w = word.lower()
-    if w in WORD_REASONS:
-        return WORD_REASONS[w]
-    if w.isdigit():
-        return "Specific number — possibly a fake money amount to seem credible"
-    if len(w) <= 2:
-        return "Short token flagged by model — may appear frequently in scam context"
-    if w.endswith("ing"):
-        return "Action word associated with scam instructions in training data"
-    return "Word statistically linked to scam patterns in training data"
+
+registry.start_watcher(app.config["MODEL_WATCH_INTERVAL"])
 
 
 # ---------- Uncertainty & follow-up adjustment ----------
@@ -200,294 +164,933 @@ def adjust_probability(base_prob: float, answers: dict) -> float:
     return min(p, 0.99)
 
 
-# ---------- LLM explanation ----------
-def generate_llm_explanation(message: str, scam_type: str, probability: int, highlights: list) -> dict:
+# ---------- Online learning from feedback ----------
+feedback_store = None
+online_learner = None
+
+try:
+    feedback_store = FeedbackStore(app.config["FEEDBACK_DB_PATH"])
+except Exception as exc:
+    print(f"✗ Feedback store unavailable: {exc}")
+
+if app.config["ONLINE_LEARNING"] and feedback_store is not None:
+    online_learner = OnlineLearner(
+        app.config["ONLINE_STATE_DIR"],
+        feedback_store,
+        bootstrap_path=os.path.join(app.root_path, "spam.csv"),
+    )
+    online_learner.start(app.config["ONLINE_TRAIN_INTERVAL"])
+
+
+def record_feedback(message: str, answers: dict):
+    # Messages are only kept when something will learn from them.
+    if online_learner is None or feedback_store is None:
+        return
+    label = label_from_answers(FOLLOWUP_QUESTIONS, answers)
+    if label is not None:
+        try:
+            feedback_store.add(message, label, "followup")
+        except Exception as exc:
+            app.logger.exception("Could not store feedback: %s", exc)
+
+
+def blend_online(p: float, message: str) -> float:
+    online = online_learner.current if online_learner else None
+    if online is None:
+        return p
+    w = app.config["ONLINE_BLEND_WEIGHT"]
+    return (1.0 - w) * p + w * online.probability(message)
+
+
+# ---------- URL / phone / UPI reputation ----------
+reputation_store = None
+
+if app.config["BLOCKLIST_PATH"] and os.path.exists(app.config["BLOCKLIST_PATH"]):
     try:
-        client = Groq(api_key=app.config["GROQ_API_KEY"])
-        flagged = ", ".join([f'"{w}" (impact {s:.2f})' for w, s, r in highlights[:5]])
-        prompt = f"""You are a cybersecurity AI assistant specializing in scam detection in India.
-Message: \"\"\"{message}\"\"\"
-ML Results: Scam Type: {scam_type}, Risk: {probability}%, Flagged words: {flagged}
-
-Reply ONLY in this JSON format with no extra text:
-{{
-  "scam_goal": "1-2 sentences on what this scam wants",
-  "what_to_do": "2-3 specific actions to take now",
-  "how_to_avoid": "2-3 tips to avoid this scam"
-}}"""
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=400,
-        )
-        raw = response.choices[0].message.content.strip()
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        result = json.loads(raw.strip())
-        return result
+        reputation_store = ReputationStore.load(app.config["BLOCKLIST_PATH"])
+        print(f"✓ Blocklist loaded: {reputation_store.bloom.count} entries")
     except Exception as exc:
-        print(f"LLM ERROR: {exc}")
+        print(f"✗ Error loading blocklist: {exc}")
+
+
+def entity_signals(message: str):
+    """Return ``(boost, highlights, entities)`` for the URLs, domains, UPI IDs
+    and phone numbers in a message."""
+    boost = 0.0
+    highlights = []
+    entities = []
+    for entity in extract_entities(message):
+        blocked = reputation_store is not None and reputation_store.is_blocked(entity)
+        entities.append({"type": entity.kind, "value": entity.value, "blocklisted": blocked})
+        label = entity.value if entity.kind in ("domain", "shortlink") else entity.text
+        if blocked:
+            boost += app.config["BLOCKLIST_BOOST"]
+            highlights.append((label, app.config["BLOCKLIST_BOOST"], BLOCKLISTED_REASON))
+        elif entity.kind == "shortlink":
+            boost += app.config["SHORTLINK_BOOST"]
+            highlights.append((label, app.config["SHORTLINK_BOOST"], SHORTLINK_REASON))
+    return boost, highlights, entities
+
+
+def apply_entity_signals(p: float, highlights: list, message: str, reason_ids: bool = False, engine=None):
+    boost, entity_highlights, entities = entity_signals(message)
+    if entity_highlights:
+        if reason_ids:
+            reasons = (engine or registry.engine).reason_index
+            entity_highlights = [(w, s, reasons.intern(r)) for w, s, r in entity_highlights]
+        highlights = entity_highlights + list(highlights)
+        p = max(p, min(p + boost, 0.99))
+    return p, highlights, entities
+
+
+# ---------- Verdict helpers ----------
+scam_type_matcher = ScamTypeMatcher()
+
+
+def risk_band(probability: int, followup_submitted: bool = False):
+    if 35 <= probability <= 65 and not followup_submitted:
+        return "Uncertain", "Needs More Context"
+    if probability >= 80:
+        return "Very High", "SCAM"
+    if probability >= 65:
+        return "High", "Likely Scam"
+    if probability >= 35:
+        return "Medium", "Suspicious"
+    return "Low", "Likely Safe"
+
+
+def detect_scam_type(message: str) -> str:
+    return scam_type_matcher.classify(message)
+
+
+def fallback_explanation(status: str) -> dict:
+    if status in ["SCAM", "Likely Scam", "Suspicious"]:
+        return {
+            "scam_goal": "Likely trying to steal money, account access, or personal/banking information.",
+            "what_to_do": "Do NOT click links or share OTP/PIN/CVV. Verify using official app/website or known phone number.",
+            "how_to_avoid": "Slow down, check domain/sender, avoid urgency pressure, never share OTPs.",
+        }
+    if status == "Needs More Context":
+        return {
+            "scam_goal": "Cannot determine intent confidently — please answer the questions below.",
+            "what_to_do": "Answer the follow-up questions so we can refine the analysis.",
+            "how_to_avoid": "When in doubt, do not click links or share personal information.",
+        }
+    return {
+        "scam_goal": "No strong scam intent detected from ML signals.",
+        "what_to_do": "No immediate action required, but stay cautious with unexpected links or requests.",
+        "how_to_avoid": "Verify unknown senders and avoid sharing sensitive details.",
+    }
+
+
+# ---------- Tiered cascade ----------
+RISK_RANK = {"Low": 0, "Medium": 1, "Uncertain": 1, "High": 2, "Very High": 3}
+
+tier_stats = TierStats()
+prefilters = {}
+
+
+def get_prefilter(snapshot) -> Prefilter:
+    prefilter = prefilters.get(snapshot.version)
+    if prefilter is None:
+        prefilter = Prefilter(snapshot.engine)
+        prefilters.clear()
+        prefilters[snapshot.version] = prefilter
+    return prefilter
+
+
+def prefilter_clear(message: str, snapshot):
+    """Tier 0: return a probability bound when the message is provably
+    low-risk, or None to send it on to the full model."""
+    bound = get_prefilter(snapshot).upper_bound(message)
+    if bound is None:
+        return None
+    online = online_learner.current if online_learner else None
+    if online is not None:
+        w = app.config["ONLINE_BLEND_WEIGHT"]
+        bound = (1.0 - w) * bound + w * online.probability(message)
+    if bound >= app.config["CASCADE_CLEAR_BELOW"]:
+        return None
+    if entity_signals(message)[0] > 0:
+        return None
+    return bound
+
+
+def llm_allowed(result: dict) -> bool:
+    return RISK_RANK.get(result["risk_level"], 0) >= RISK_RANK.get(app.config["LLM_MIN_RISK"], 0)
+
+
+# ---------- Rate limiting & admission control ----------
+rate_limiter = None
+try:
+    rate_limiter = make_rate_limiter(
+        app.config["RATE_LIMIT_PER_MINUTE"],
+        app.config["RATE_LIMIT_BURST"],
+        backend=app.config["RATE_LIMIT_BACKEND"],
+        db_path=app.config["RATE_LIMIT_DB_PATH"],
+    )
+except Exception as exc:
+    print(f"✗ Rate limiter unavailable: {exc}")
+
+llm_admission = make_admission_gate(
+    app.config["LLM_MAX_INFLIGHT"],
+    app.config["LLM_MAX_QUEUE"],
+    backend=app.config["LLM_ADMISSION_BACKEND"],
+    directory=app.config["LLM_ADMISSION_DIR"],
+)
+
+
+def client_key(headers, remote_addr: str) -> str:
+    header = app.config["RATE_LIMIT_KEY_HEADER"]
+    hops = [hop.strip() for hop in headers.get(header, "").split(",")] if header else []
+    # Proxies append to X-Forwarded-For, so everything left of the hops our
+    # own proxies added is whatever the client chose to send. Count from the
+    # right, and ignore a header shorter than the trusted chain.
+    trusted = app.config["RATE_LIMIT_TRUSTED_HOPS"]
+    if trusted > 0 and len(hops) >= trusted and hops[-trusted]:
+        return hops[-trusted]
+    return remote_addr or "unknown"
+
+
+def check_rate_limit(key: str, cost: float = 1.0):
+    """Return ``None`` if allowed, else the seconds until enough tokens refill."""
+    if rate_limiter is None:
         return None
+    allowed, retry_after = rate_limiter.acquire(key, cost)
+    return None if allowed else retry_after
+
+
+def rate_limited_response(retry_after: float):
+    response = jsonify({"error": "Rate limit exceeded", "retry_after": round(retry_after, 2)})
+    response.status_code = 429
+    response.headers["Retry-After"] = retry_after_header(retry_after)
+    return response
+
+
+def enforce_rate_limit(cost: float = 1.0):
+    retry_after = check_rate_limit(client_key(request.headers, request.remote_addr), cost)
+    return rate_limited_response(retry_after) if retry_after is not None else None
+
+
+def has_token(token: str, header: str) -> bool:
+    # An unset token disables the route rather than leaving it open.
+    return bool(token) and hmac.compare_digest(request.headers.get(header, ""), token)
+
+
+# ---------- LLM explanation ----------
+explainer = ExplanationService(
+    api_key=app.config["GROQ_API_KEY"],
+    model=app.config["GROQ_MODEL"],
+    base_url=app.config["GROQ_BASE_URL"],
+    timeout=app.config["LLM_TIMEOUT"],
+    max_workers=app.config["LLM_MAX_WORKERS"],
+    max_pending=app.config["LLM_MAX_PENDING"],
+    max_async=app.config["LLM_MAX_ASYNC"],
+    admission=llm_admission,
+    queue_timeout=app.config["LLM_QUEUE_TIMEOUT"],
+    breaker=CircuitBreaker(
+        failure_threshold=app.config["LLM_BREAKER_THRESHOLD"],
+        reset_timeout=app.config["LLM_BREAKER_RESET"],
+    ),
+)
+
+
+explanation_cache = ExplanationCache(
+    capacity=app.config["CACHE_CAPACITY"],
+    ttl=app.config["CACHE_TTL"],
+    db_path=app.config["CACHE_DB_PATH"] or None,
+)
+
+
+def generate_llm_explanation(message: str, scam_type: str, probability: int, highlights: list) -> dict:
+    cached = explanation_cache.get(message, scam_type, probability)
+    if cached:
+        metrics.inc(metrics.explanations, "cache")
+        return cached
+    with metrics.span("llm"):
+        result = explainer.explain(
+            message, scam_type, probability, highlights,
+            on_result=lambda result: explanation_cache.set(message, scam_type, probability, result),
+        )
+    metrics.inc(metrics.explanations, "llm" if result else "fallback")
+    return result
+
+
+def defer_llm_explanation(message: str, scam_type: str, probability: int, highlights: list, fallback: dict):
+    cached = explanation_cache.get(message, scam_type, probability)
+    if cached:
+        metrics.inc(metrics.explanations, "cache")
+        return cached, None
+    metrics.inc(metrics.explanations, "deferred")
+    explanation_id = explainer.defer(
+        message, scam_type, probability, highlights, fallback,
+        on_result=lambda result: explanation_cache.set(message, scam_type, probability, result),
+    )
+    return None, explanation_id
 
 
 # ---------- Explainability helpers ----------
 def get_class1_index():
-    classes = list(model.classes_)
-    if 1 not in classes:
-        raise ValueError("Model does not contain class 1")
-    return classes.index(1)
+    return registry.engine.class1_index
+
+
+def with_reasons(contribs, reason_ids: bool = False, engine: ScoringEngine = None):
+    if reason_ids:
+        return list(contribs)
+    reasons = (engine or registry.engine).reason_index.reasons
+    return [(word, score, reasons[reason_id]) for word, score, reason_id in contribs]
 
 
 def predict_proba_class1(text: str) -> float:
-    X = vectorizer.transform([text])
-    probas = model.predict_proba(X)
-    idx1 = get_class1_index()
-    return float(probas[0][idx1])
+    engine = registry.engine
+    return engine.probability(engine.transform(text))
 
 
 def top_contributing_words(text: str, top_k: int = 8):
-    X = vectorizer.transform([text])
-    idx1 = get_class1_index()
+    engine = registry.engine
+    return with_reasons(engine.contributions(engine.transform(text), top_k=top_k, text=text), engine=engine)
+
+
+score_cache = LRUCache(capacity=app.config["CACHE_CAPACITY"], ttl=app.config["CACHE_TTL"])
+registry.listeners.append(lambda snapshot: score_cache.clear())
+
+
+def score_message(text: str, top_k: int = 8, reason_ids: bool = False, snapshot=None):
+    snapshot = snapshot or registry.current
+    key = (snapshot.version, snapshot.engine.fingerprint(text), top_k)
+    cached = score_cache.get(key)
+    if cached is None:
+        engine = snapshot.engine
+        with metrics.span("transform"):
+            row = engine.transform(text)
+        with metrics.span("predict_proba"):
+            p = engine.probability(row)
+        with metrics.span("top_contributing_words"):
+            contribs = engine.contributions(row, top_k=top_k, text=text)
+        cached = (p, contribs)
+        score_cache.set(key, cached)
+    p, contribs = cached
+    return p, with_reasons(contribs, reason_ids, engine=snapshot.engine)
+
+
+# ---------- Analysis pipeline ----------
+def empty_result(message: str = "") -> dict:
+    return {
+        "message": message,
+        "status": None,
+        "probability": None,
+        "risk_level": None,
+        "scam_type": None,
+        "scam_goal": None,
+        "what_to_do": None,
+        "how_to_avoid": None,
+        "highlights": [],
+        "is_uncertain": False,
+        "followup_questions": [],
+        "scam_signals": [],
+        "model_version": None,
+        "campaign": None,
+        "entities": [],
+        "degraded": False,
+    }
+
+
+def score_stage(message: str, followup_answers: dict = None, followup_submitted: bool = False,
+                reason_ids: bool = False, snapshot=None) -> dict:
+    # CPU-bound half of the pipeline: scoring, banding and scam-type matching.
+    result = empty_result(message)
+    snapshot = snapshot or registry.current
+    if not snapshot:
+        return result
+    result["model_version"] = snapshot.version
+    if not message:
+        return result
 
-    coef = model.coef_
-    if coef.shape[0] == 1:
-        weights = coef[0]
+    cleared = None
+    if app.config["CASCADE_ENABLED"] and not followup_submitted:
+        with metrics.span("prefilter"):
+            cleared = prefilter_clear(message, snapshot)
+    # The caller records the tier: this may run in a pool process.
+    if cleared is not None:
+        result["tier"] = "prefilter_cleared"
+        p, highlights = cleared, []
     else:
-        weights = coef[idx1]
+        result["tier"] = "full_model"
+        p, highlights = score_message(message, top_k=8, reason_ids=reason_ids, snapshot=snapshot)
+        with metrics.span("online_blend"):
+            p = blend_online(p, message)
 
-    feature_names = vectorizer.get_feature_names_out()
+    if followup_submitted and followup_answers:
+        with metrics.span("followup"):
+            record_feedback(message, followup_answers)
+            p = adjust_probability(p, followup_answers)
 
-    row = X.tocoo()
-    contribs = []
-    for j, v in zip(row.col, row.data):
-        w = weights[j]
-        score = float(v * w)
-        if score > 0:
-            word = feature_names[j]
-            reason = get_word_reason(word)
-            contribs.append((word, score, reason))
+    with metrics.span("entities"):
+        p, highlights, entities = apply_entity_signals(p, highlights, message, reason_ids, snapshot.engine)
 
-    contribs.sort(key=lambda x: x[1], reverse=True)
-    return contribs[:top_k]
+    probability = int(round(p * 100))
+    risk_level, status = risk_band(probability, followup_submitted)
+    with metrics.span("scam_type"):
+        scam_type, scam_signals = scam_type_matcher.match(message)
+
+    result.update({
+        "status": status,
+        "probability": probability,
+        "risk_level": risk_level,
+        "scam_type": scam_type,
+        "highlights": highlights,
+        "scam_signals": scam_signals,
+        "entities": entities,
+    })
+    if status == "Needs More Context":
+        result["is_uncertain"] = True
+        result["followup_questions"] = FOLLOWUP_QUESTIONS
+    return result
+
+
+# ---------- Campaign clustering ----------
+campaign_index = CampaignIndex(
+    capacity=app.config["CAMPAIGN_CAPACITY"],
+    cluster_threshold=app.config["CAMPAIGN_CLUSTER_THRESHOLD"],
+    reuse_threshold=app.config["CAMPAIGN_REUSE_THRESHOLD"],
+) if app.config["CAMPAIGN_CAPACITY"] > 0 else None
+
+CAMPAIGN_VERDICT_FIELDS = ("status", "probability", "risk_level", "scam_type", "scam_signals")
+
+
+def campaign_payload(campaign_id: str, similarity, reused: bool) -> dict:
+    return {
+        "campaign_id": campaign_id,
+        "similarity": round(similarity, 3) if similarity is not None else None,
+        "reused": reused,
+    }
+
+
+def reuse_campaign_verdict(message: str, followup_submitted: bool = False, reason_ids: bool = False,
+                           snapshot=None):
+    """Return ``(match, result)``; ``result`` is set when a near-duplicate's
+    verdict can be served without rescoring."""
+    snapshot = snapshot or registry.current
+    if campaign_index is None or followup_submitted or not message or not snapshot:
+        return None, None
+    with metrics.span("campaign_lookup"):
+        match = campaign_index.lookup(message, snapshot.version)
+    if match is None or not match.reusable:
+        return match, None
+    _, _, entities = entity_signals(message)
+    if any(e["blocklisted"] for e in entities):
+        # Rescore so this variant's own known-bad infrastructure counts.
+        return match, None
+
+    campaign_index.hit(match.campaign_id, message, match.verdict)
+    metrics.inc(metrics.campaign_reuse)
+    result = empty_result(message)
+    result.update({field: match.verdict[field] for field in CAMPAIGN_VERDICT_FIELDS})
+    # The stored highlights belong to an earlier variant; keep only words
+    # this message actually contains ("earn 800" must not flag "800" here).
+    highlights = [h for h in match.verdict["highlights"] if snapshot.engine.contains(message, h[0])]
+    if reason_ids:
+        highlights = [(w, s, snapshot.engine.reason_index.intern(r)) for w, s, r in highlights]
+    result["highlights"] = highlights
+    result["entities"] = entities
+    result["model_version"] = snapshot.version
+    result["campaign"] = campaign_payload(match.campaign_id, match.similarity, reused=True)
+    if result["status"] == "Needs More Context":
+        result["is_uncertain"] = True
+        result["followup_questions"] = FOLLOWUP_QUESTIONS
+    if match.explanation:
+        apply_explanation(result, match.explanation)
+    return match, result
+
+
+def record_campaign(message: str, result: dict, llm: dict, match=None, reason_ids: bool = False):
+    if campaign_index is None or result["status"] is None:
+        return
+    verdict = {field: result[field] for field in CAMPAIGN_VERDICT_FIELDS}
+    verdict["highlights"] = with_reasons(result["highlights"]) if reason_ids else list(result["highlights"])
+    campaign_id = campaign_index.add(message, verdict, llm, result["model_version"])
+    result["campaign"] = campaign_payload(
+        campaign_id, match.similarity if match is not None else None,
+        reused=bool(result["campaign"] and result["campaign"]["reused"]),
+    )
+
+
+def apply_explanation(result: dict, llm: dict) -> dict:
+    explanation = llm or fallback_explanation(result["status"])
+    result["scam_goal"] = explanation.get("scam_goal", "")
+    result["what_to_do"] = explanation.get("what_to_do", "")
+    result["how_to_avoid"] = explanation.get("how_to_avoid", "")
+    return result
+
+
+def score_stage_captured(*args) -> tuple:
+    """``score_stage`` for a process pool: returns ``(result, spans)``."""
+    with metrics.capture() as spans:
+        result = score_stage(*args)
+    return result, spans
+
+
+def analysis_steps(message: str, followup_answers: dict = None, followup_submitted: bool = False,
+                   defer_explanation: bool = False, reason_ids: bool = False, explain: bool = True):
+    """The analysis pipeline, shared by the WSGI and ASGI entry points.
+
+    A generator: it yields ``("score", args)`` and ``("llm", args)`` for the
+    two blocking stages and is sent their results, so each entry point only
+    decides how to run them (inline, on a pool, or awaited). Errors are
+    logged and the result so far is returned.
+    """
+    result = empty_result(message)
+    try:
+        snapshot = registry.current
+        # A separate name, so a failing score stage leaves the empty result.
+        match, reused = reuse_campaign_verdict(message, followup_submitted, reason_ids, snapshot)
+        result = reused or (yield "score", (message, followup_answers, followup_submitted, reason_ids, snapshot))
+        tier = result.pop("tier", None)
+        if tier:
+            tier_stats.record(tier)
+        if result["status"] is None or result["scam_goal"] is not None:
+            return result
+
+        args = (message, result["scam_type"], result["probability"], result["highlights"])
+        if not explain:
+            # The client did not ask for explanation fields.
+            llm = None
+        elif not llm_allowed(result):
+            tier_stats.record("llm_skipped")
+            llm = None
+        elif defer_explanation:
+            tier_stats.record("llm")
+            llm, explanation_id = defer_llm_explanation(*args, fallback_explanation(result["status"]))
+            if explanation_id:
+                result["explanation_id"] = explanation_id
+        else:
+            tier_stats.record("llm")
+            llm = yield "llm", args
+            # Shed, timed out or failed: the ML verdict stands on its own.
+            result["degraded"] = llm is None
+        apply_explanation(result, llm)
+        if not followup_submitted:
+            record_campaign(message, result, llm, match, reason_ids)
+    except Exception as exc:
+        metrics.inc(metrics.errors, "analyze")
+        app.logger.exception("Error during ML analysis: %s", exc)
+    return result
+
+
+def run_steps(steps, stages: dict):
+    """Drive ``analysis_steps`` with plain callables for each stage."""
+    try:
+        stage, args = next(steps)
+        while True:
+            try:
+                value = stages[stage](*args)
+            except Exception as exc:
+                stage, args = steps.throw(exc)
+            else:
+                stage, args = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_steps(steps, stages: dict):
+    """``run_steps`` for stages that return awaitables."""
+    try:
+        stage, args = next(steps)
+        while True:
+            try:
+                value = await stages[stage](*args)
+            except Exception as exc:
+                stage, args = steps.throw(exc)
+            else:
+                stage, args = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+def analyze_message(message: str, followup_answers: dict = None, followup_submitted: bool = False,
+                    defer_explanation: bool = False, reason_ids: bool = False, explain: bool = True) -> dict:
+    steps = analysis_steps(message, followup_answers, followup_submitted, defer_explanation, reason_ids, explain)
+    return run_steps(steps, {"score": score_stage, "llm": generate_llm_explanation})
 
 
 # ---------- Web page route ----------
 @app.route("/", methods=["GET", "POST"])
 def home():
-    status = None
-    probability = None
-    risk_level = None
-    scam_type = None
-    scam_goal = None
-    what_to_do = None
-    how_to_avoid = None
-    message = ""
-    highlights = []
-    is_uncertain = False
-    followup_questions = []
-    followup_answers = {}
+    result = empty_result()
     followup_submitted = False
 
     if request.method == "POST":
+        limited = enforce_rate_limit()
+        if limited is not None:
+            return limited
         message = request.form.get("message", "").strip()
         followup_submitted = request.form.get("followup_submitted") == "1"
 
+        followup_answers = {}
         for q in FOLLOWUP_QUESTIONS:
             ans = request.form.get(q["id"], "").strip()
             if ans:
                 followup_answers[q["id"]] = ans
 
-        if message and model and vectorizer:
-            try:
-                p = predict_proba_class1(message)
+        result = analyze_message(message, followup_answers, followup_submitted)
 
-                if followup_submitted and followup_answers:
-                    p = adjust_probability(p, followup_answers)
+    return render_template("index.html", followup_submitted=followup_submitted, **result)
 
-                probability = int(round(p * 100))
 
-                if 35 <= probability <= 65 and not followup_submitted:
-                    is_uncertain = True
-                    followup_questions = FOLLOWUP_QUESTIONS
-                    risk_level = "Uncertain"
-                    status = "Needs More Context"
-                elif probability >= 80:
-                    risk_level = "Very High"
-                    status = "SCAM"
-                elif probability >= 65:
-                    risk_level = "High"
-                    status = "Likely Scam"
-                elif probability >= 35:
-                    risk_level = "Medium"
-                    status = "Suspicious"
-                else:
-                    risk_level = "Low"
-                    status = "Likely Safe"
-
-                highlights = top_contributing_words(message, top_k=8)
-
-                msg_lower = message.lower()
-                if any(w in msg_lower for w in ["otp", "verification code", "login code"]):
-                    scam_type = "OTP / Verification Code Hijack"
-                elif any(w in msg_lower for w in ["kyc", "account suspended", "verify your account"]):
-                    scam_type = "KYC / Account Verification Phishing"
-                elif any(w in msg_lower for w in ["job", "hiring", "work from home", "task", "commission", "salary per day"]):
-                    scam_type = "Recruitment / Task Scam"
-                elif any(w in msg_lower for w in ["delivery", "parcel", "shipment", "customs", "courier"]):
-                    scam_type = "Delivery / Logistics Phishing"
-                elif any(w in msg_lower for w in ["refund", "cashback"]):
-                    scam_type = "Refund / Cashback Scam"
-                elif any(w in msg_lower for w in ["won", "lottery", "prize", "claim"]):
-                    scam_type = "Lottery / Prize Scam"
-                else:
-                    scam_type = "General Scam / Phishing"
-
-                llm = generate_llm_explanation(message, scam_type, probability, highlights)
-
-                if llm:
-                    scam_goal = llm.get("scam_goal", "")
-                    what_to_do = llm.get("what_to_do", "")
-                    how_to_avoid = llm.get("how_to_avoid", "")
-                else:
-                    if status in ["SCAM", "Likely Scam", "Suspicious"]:
-                        scam_goal = "Likely trying to steal money, account access, or personal/banking information."
-                        what_to_do = "Do NOT click links or share OTP/PIN/CVV. Verify using official app/website or known phone number."
-                        how_to_avoid = "Slow down, check domain/sender, avoid urgency pressure, never share OTPs."
-                    elif status == "Needs More Context":
-                        scam_goal = "Cannot determine intent confidently — please answer the questions below."
-                        what_to_do = "Answer the follow-up questions so we can refine the analysis."
-                        how_to_avoid = "When in doubt, do not click links or share personal information."
-                    else:
-                        scam_goal = "No strong scam intent detected from ML signals."
-                        what_to_do = "No immediate action required, but stay cautious with unexpected links or requests."
-                        how_to_avoid = "Verify unknown senders and avoid sharing sensitive details."
+# ---------- Response schemas ----------
+_static_documents = {}
 
-            except Exception as exc:
-                app.logger.exception("Error during ML analysis: %s", exc)
-
-    return render_template(
-        "index.html",
-        status=status,
-        probability=probability,
-        risk_level=risk_level,
-        scam_type=scam_type,
-        scam_goal=scam_goal,
-        what_to_do=what_to_do,
-        how_to_avoid=how_to_avoid,
-        message=message,
-        highlights=highlights,
-        is_uncertain=is_uncertain,
-        followup_questions=followup_questions,
-        followup_submitted=followup_submitted,
-    )
+
+def static_for(snapshot):
+    # One document per model version: reason IDs are only stable within one.
+    cached = _static_documents.get(snapshot.version)
+    if cached is None:
+        cached = _static_documents[snapshot.version] = static_document(
+            snapshot.version, snapshot.engine.reason_index.table(), FOLLOWUP_QUESTIONS
+        )
+    return cached
+
+
+def response_options(data: dict, args) -> tuple:
+    """``(schema, fields)`` from the JSON body, falling back to the query string."""
+    schema = data.get("schema", args.get("schema"))
+    fields = data.get("fields", args.get("fields"))
+    return parse_version(schema), parse_fields(fields)
+
+
+def render_result(result: dict, schema: int, fields=None, header: bool = True) -> dict:
+    if schema == 1:
+        return select_fields(result, fields)
+    snapshot = registry.current
+    etag = None
+    if header and snapshot and snapshot.version == result.get("model_version"):
+        etag = static_for(snapshot)[1]
+    return compact_result(result, fields, etag, header=header)
+
+
+@app.route("/api/static", methods=["GET"])
+def api_static():
+    snapshot = registry.current
+    if not snapshot:
+        return jsonify({"error": "Model is not loaded"}), 503
+    document, etag = static_for(snapshot)
+    response = jsonify(document)
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config["STATIC_MAX_AGE"]
+    return response.make_conditional(request)
 
 
 # ---------- JSON API route (for fetch / no reload) ----------
 @app.route("/api/analyze", methods=["POST"])
 def api_analyze():
-    status = None
-    probability = None
-    risk_level = None
-    scam_type = None
-    scam_goal = None
-    what_to_do = None
-    how_to_avoid = None
-    message = ""
-    highlights = []
-    is_uncertain = False
-    followup_questions = []
-    followup_answers = {}
-    followup_submitted = False
+    limited = enforce_rate_limit()
+    if limited is not None:
+        return limited
+    data = request.get_json(silent=True) or {}
+    try:
+        schema, fields = response_options(data, request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    result = analyze_message(
+        (data.get("message") or "").strip(),
+        followup_answers=data.get("followup_answers") or {},
+        followup_submitted=bool(data.get("followup_submitted")),
+        defer_explanation=bool(data.get("defer_explanation")),
+        reason_ids=schema == 2 or bool(data.get("reason_ids")),
+        explain=wants_explanation(fields),
+    )
+    return jsonify(render_result(result, schema, fields))
+
+
+# ---------- Feedback route ----------
+@app.route("/api/feedback", methods=["POST"])
+def api_feedback():
+    limited = enforce_rate_limit()
+    if limited is not None:
+        return limited
+    if not (has_token(app.config["FEEDBACK_TOKEN"], "X-Feedback-Token")
+            or has_token(app.config["ADMIN_TOKEN"], "X-Admin-Token")):
+        return jsonify({"error": "Forbidden"}), 403
 
     data = request.get_json(silent=True) or {}
     message = (data.get("message") or "").strip()
-    followup_answers = data.get("followup_answers") or {}
-    followup_submitted = bool(data.get("followup_submitted"))
+    label = data.get("label")
+    label = 1 if label in ("scam", 1) else 0 if label in ("safe", 0) else None
+    if not message or label is None:
+        return jsonify({"error": "'message' and a 'label' of 'scam' or 'safe' are required"}), 400
+    if feedback_store is None:
+        return jsonify({"error": "Feedback store is unavailable"}), 503
+    feedback_id = feedback_store.add(message, label, "explicit")
+    return jsonify({
+        "feedback_id": feedback_id,
+        "online_learning": bool(online_learner),
+        "online_model_version": online_learner.current.version if online_learner and online_learner.current else None,
+    }), 201
+
+
+# ---------- Deferred explanation routes ----------
+def explanation_payload(explanation_id: str, state: str, explanation: dict) -> dict:
+    payload = {"explanation_id": explanation_id, "state": state}
+    if explanation:
+        payload.update({
+            "scam_goal": explanation.get("scam_goal", ""),
+            "what_to_do": explanation.get("what_to_do", ""),
+            "how_to_avoid": explanation.get("how_to_avoid", ""),
+        })
+    return payload
+
+
+@app.route("/api/explanation/<explanation_id>", methods=["GET"])
+def api_explanation(explanation_id):
+    wait = min(max(request.args.get("wait", 0.0, type=float), 0.0), app.config["LLM_TIMEOUT"])
+    state, explanation = explainer.lookup(explanation_id, wait=wait)
+    if state == "unknown":
+        return jsonify(explanation_payload(explanation_id, state, None)), 404
+    return jsonify(explanation_payload(explanation_id, state, explanation))
+
+
+@app.route("/api/explanation/<explanation_id>/stream", methods=["GET"])
+def api_explanation_stream(explanation_id):
+    def generate():
+        state, explanation = explainer.lookup(explanation_id)
+        while state == "pending":
+            yield ": waiting\n\n"
+            state, explanation = explainer.lookup(explanation_id, wait=1.0)
+        payload = json.dumps(explanation_payload(explanation_id, state, explanation), ensure_ascii=False)
+        yield f"event: explanation\ndata: {payload}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    if message and model and vectorizer:
-        try:
-            p = predict_proba_class1(message)
-
-            if followup_submitted and followup_answers:
-                p = adjust_probability(p, followup_answers)
-
-            probability = int(round(p * 100))
-
-            if 35 <= probability <= 65 and not followup_submitted:
-                is_uncertain = True
-                followup_questions = FOLLOWUP_QUESTIONS
-                risk_level = "Uncertain"
-                status = "Needs More Context"
-            elif probability >= 80:
-                risk_level = "Very High"
-                status = "SCAM"
-            elif probability >= 65:
-                risk_level = "High"
-                status = "Likely Scam"
-            elif probability >= 35:
-                risk_level = "Medium"
-                status = "Suspicious"
-            else:
-                risk_level = "Low"
-                status = "Likely Safe"
-
-            highlights = top_contributing_words(message, top_k=8)
-
-            msg_lower = message.lower()
-            if any(w in msg_lower for w in ["otp", "verification code", "login code"]):
-                scam_type = "OTP / Verification Code Hijack"
-            elif any(w in msg_lower for w in ["kyc", "account suspended", "verify your account"]):
-                scam_type = "KYC / Account Verification Phishing"
-            elif any(w in msg_lower for w in ["job", "hiring", "work from home", "task", "commission", "salary per day"]):
-                scam_type = "Recruitment / Task Scam"
-            elif any(w in msg_lower for w in ["delivery", "parcel", "shipment", "customs", "courier"]):
-                scam_type = "Delivery / Logistics Phishing"
-            elif any(w in msg_lower for w in ["refund", "cashback"]):
-                scam_type = "Refund / Cashback Scam"
-            elif any(w in msg_lower for w in ["won", "lottery", "prize", "claim"]):
-                scam_type = "Lottery / Prize Scam"
-            else:
-                scam_type = "General Scam / Phishing"
 
-            llm = generate_llm_explanation(message, scam_type, probability, highlights)
+@app.route("/api/reasons", methods=["GET"])
+def api_reasons():
+    engine = registry.engine
+    if not engine:
+        return jsonify({"error": "Model is not loaded"}), 503
+    return jsonify({"reasons": engine.reason_index.table()})
 
-            if llm:
-                scam_goal = llm.get("scam_goal", "")
-                what_to_do = llm.get("what_to_do", "")
-                how_to_avoid = llm.get("how_to_avoid", "")
-            else:
-                if status in ["SCAM", "Likely Scam", "Suspicious"]:
-                    scam_goal = "Likely trying to steal money, account access, or personal/banking information."
-                    what_to_do = "Do NOT click links or share OTP/PIN/CVV. Verify using official app/website or known phone number."
-                    how_to_avoid = "Slow down, check domain/sender, avoid urgency pressure, never share OTPs."
-                elif status == "Needs More Context":
-                    scam_goal = "Cannot determine intent confidently — please answer the questions below."
-                    what_to_do = "Answer the follow-up questions so we can refine the analysis."
-                    how_to_avoid = "When in doubt, do not click links or share personal information."
-                else:
-                    scam_goal = "No strong scam intent detected from ML signals."
-                    what_to_do = "No immediate action required, but stay cautious with unexpected links or requests."
-                    how_to_avoid = "Verify unknown senders and avoid sharing sensitive details."
 
-        except Exception as exc:
-            app.logger.exception("Error during ML analysis: %s", exc)
+@app.route("/api/cache/stats", methods=["GET"])
+def api_cache_stats():
+    return jsonify({
+        "explanations": explanation_cache.stats(),
+        "scores": score_cache.stats(),
+    })
 
+
+@app.route("/api/cascade/stats", methods=["GET"])
+def api_cascade_stats():
     return jsonify({
-        "message": message,
-        "status": status,
-        "probability": probability,
-        "risk_level": risk_level,
-        "scam_type": scam_type,
-        "scam_goal": scam_goal,
-        "what_to_do": what_to_do,
-        "how_to_avoid": how_to_avoid,
-        "highlights": highlights,
-        "is_uncertain": is_uncertain,
-        "followup_questions": followup_questions,
+        "enabled": app.config["CASCADE_ENABLED"],
+        "clear_below": app.config["CASCADE_CLEAR_BELOW"],
+        "llm_min_risk": app.config["LLM_MIN_RISK"],
+        **tier_stats.stats(),
     })
 
 
+@app.route("/api/limits/stats", methods=["GET"])
+def api_limits_stats():
+    return jsonify({
+        "rate_limit": {
+            "enabled": rate_limiter is not None,
+            "per_minute": app.config["RATE_LIMIT_PER_MINUTE"],
+            "burst": app.config["RATE_LIMIT_BURST"],
+            "backend": app.config["RATE_LIMIT_BACKEND"],
+        },
+        "llm_admission": dict(llm_admission.stats(), backend=app.config["LLM_ADMISSION_BACKEND"])
+        if llm_admission else None,
+        "llm": explainer.stats(),
+    })
+
+
+# ---------- Prometheus metrics ----------
+BREAKER_STATES = {"closed": 0, "half-open": 1, "open": 2}
+
+metrics.collector("llm_calls_total", "LLM call outcomes.", "counter",
+                  lambda: explainer.stats()["outcomes"], labelname="outcome")
+metrics.collector("llm_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", "gauge",
+                  lambda: BREAKER_STATES[explainer.breaker.state])
+metrics.collector("cache_hits_total", "Cache hits by cache.", "counter", lambda: {
+    "explanations": explanation_cache.memory.hits, "scores": score_cache.hits,
+}, labelname="cache")
+metrics.collector("cache_misses_total", "Cache misses by cache.", "counter", lambda: {
+    "explanations": explanation_cache.memory.misses, "scores": score_cache.misses,
+}, labelname="cache")
+metrics.collector("cascade_tier_total", "Analyses handled by each cascade tier.", "counter",
+                  tier_stats.counts, labelname="tier")
+metrics.collector("llm_admission_total", "LLM admission decisions.", "counter", lambda: {
+    "admitted": llm_admission.admitted, "shed": llm_admission.shed, "queue_timeout": llm_admission.timeouts,
+} if llm_admission else {}, labelname="decision")
+metrics.collector("model_loaded_timestamp_seconds", "When the live model version was loaded.", "gauge",
+                  lambda: registry.current.loaded_at)
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled (set METRICS_ENABLED=1)"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# ---------- Campaign routes ----------
+@app.route("/api/campaigns", methods=["GET"])
+def api_campaigns():
+    # Examples are user-submitted text, so only operators may list them.
+    if not has_token(app.config["ADMIN_TOKEN"], "X-Admin-Token"):
+        return jsonify({"error": "Forbidden"}), 403
+    if campaign_index is None:
+        return jsonify({"error": "Campaign clustering is disabled"}), 404
+    min_size = request.args.get("min_size", 2, type=int)
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    return jsonify({
+        "campaigns": campaign_index.campaigns(min_size=min_size, limit=limit),
+        "stats": campaign_index.stats(),
+    })
+
+
+@app.route("/api/campaigns/<campaign_id>", methods=["GET"])
+def api_campaign(campaign_id):
+    if not has_token(app.config["ADMIN_TOKEN"], "X-Admin-Token"):
+        return jsonify({"error": "Forbidden"}), 403
+    campaign = campaign_index.campaign(campaign_id) if campaign_index is not None else None
+    if campaign is None:
+        return jsonify({"error": "Unknown campaign"}), 404
+    return jsonify(campaign)
+
+
+# ---------- Batch analysis ----------
+def iter_analyze_batch(messages, top_k: int = 8, chunk_size: int = 256, reason_ids: bool = False,
+                       snapshot=None):
+    snapshot = snapshot or registry.current
+    engine = snapshot.engine
+    for start in range(0, len(messages), chunk_size):
+        chunk = [m.strip() if isinstance(m, str) else "" for m in messages[start:start + chunk_size]]
+        texts = [m for m in chunk if m]
+        with metrics.span("batch_score"):
+            scored = engine.score_batch(texts, top_k=top_k)
+        online = online_learner.current if online_learner else None
+        if online is not None and texts:
+            w = app.config["ONLINE_BLEND_WEIGHT"]
+            online_p = online.probabilities(texts)
+            scored = [((1.0 - w) * p + w * float(q), contribs) for (p, contribs), q in zip(scored, online_p)]
+        scored = iter(scored)
+        for offset, message in enumerate(chunk):
+            result = {
+                "index": start + offset,
+                "message": message,
+                "status": None,
+                "probability": None,
+                "risk_level": None,
+                "scam_type": None,
+                "highlights": [],
+                "is_uncertain": False,
+                "model_version": snapshot.version,
+                "entities": [],
+            }
+            if message:
+                p, contribs = next(scored)
+                p, highlights, entities = apply_entity_signals(
+                    p, with_reasons(contribs, reason_ids, engine=engine), message, reason_ids, engine
+                )
+                probability = int(round(p * 100))
+                risk_level, status = risk_band(probability)
+                result.update({
+                    "status": status,
+                    "probability": probability,
+                    "risk_level": risk_level,
+                    "scam_type": detect_scam_type(message),
+                    "highlights": highlights,
+                    "is_uncertain": status == "Needs More Context",
+                    "entities": entities,
+                })
+            yield result
+
+
+def analyze_batch(messages, top_k: int = 8, reason_ids: bool = False, snapshot=None) -> list:
+    return list(iter_analyze_batch(
+        messages, top_k=top_k, chunk_size=app.config["BATCH_CHUNK_SIZE"], reason_ids=reason_ids,
+        snapshot=snapshot,
+    ))
+
+
+@app.route("/api/analyze/batch", methods=["POST"])
+def api_analyze_batch():
+    data = request.get_json(silent=True) or {}
+    messages = data.get("messages")
+    if not isinstance(messages, list):
+        return jsonify({"error": "'messages' must be a list of strings"}), 400
+    if len(messages) > app.config["BATCH_MAX_MESSAGES"]:
+        return jsonify({"error": f"At most {app.config['BATCH_MAX_MESSAGES']} messages per batch"}), 413
+    # One token per scoring chunk, so large batches cost more than single calls.
+    limited = enforce_rate_limit(cost=max(1, -(-len(messages) // app.config["BATCH_CHUNK_SIZE"])))
+    if limited is not None:
+        return limited
+    snapshot = registry.current
+    if not snapshot:
+        return jsonify({"error": "Model is not loaded"}), 503
+
+    try:
+        schema, fields = response_options(data, request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    reason_ids = schema == 2 or bool(data.get("reason_ids"))
+    stream = bool(data.get("stream")) or request.args.get("stream") == "1"
+    if stream:
+        chunk_size = app.config["BATCH_CHUNK_SIZE"]
+
+        def generate():
+            for result in iter_analyze_batch(messages, chunk_size=chunk_size, reason_ids=reason_ids,
+                                             snapshot=snapshot):
+                yield json.dumps(render_result(result, schema, fields, header=False), ensure_ascii=False) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    try:
+        results = analyze_batch(messages, reason_ids=reason_ids, snapshot=snapshot)
+    except Exception as exc:
+        app.logger.exception("Error during batch ML analysis: %s", exc)
+        return jsonify({"error": "Batch analysis failed"}), 500
+    payload = {"count": len(results), "model_version": snapshot.version,
+               "results": [render_result(result, schema, fields, header=False) for result in results]}
+    if schema == 2:
+        payload.update(schema=2, static=static_for(snapshot)[1])
+    return jsonify(payload)
+
+
+# ---------- Model admin ----------
+@app.route("/api/model", methods=["GET"])
+def api_model():
+    snapshot = registry.current
+    return jsonify({
+        "model_version": snapshot.version if snapshot else None,
+        "loaded_at": snapshot.loaded_at if snapshot else None,
+        "available_versions": list_versions(app.config["ARTIFACTS_DIR"]),
+    })
+
+
+@app.route("/api/admin/reload", methods=["POST"])
+def api_admin_reload():
+    if not has_token(app.config["ADMIN_TOKEN"], "X-Admin-Token"):
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get("version"):
+            # Repoints CURRENT for every worker; the watchers pick it up.
+            set_current(app.config["ARTIFACTS_DIR"], str(data["version"]))
+        reloaded = registry.reload(force=bool(data.get("force")))
+    except FileNotFoundError as exc:
+        return jsonify({"error": str(exc), "model_version": registry.version}), 404
+    except Exception as exc:
+        app.logger.exception("Model reload failed: %s", exc)
+        return jsonify({"error": f"Model reload failed: {exc}", "model_version": registry.version}), 500
+    return jsonify({"reloaded": reloaded, "model_version": registry.version})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=app.config["DEBUG"])
\ No newline at end of file
@@ -0,0 +1,350 @@
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import time
+import unicodedata
+
+import numpy as np
+import scipy.sparse as sp
+
+from multilingual import HashedTextVectorizer
+
+
+FORMAT_VERSION = 1
+# Hashed exports have no vocabulary files; older readers must refuse them.
+HASHED_FORMAT_VERSION = 2
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+
+
+# ---------- Export ----------
+def export_artifacts(model, vectorizer, out_dir: str) -> str:
+    """Write a fitted TfidfVectorizer + linear model as memory-mappable files.
+
+    Layout: ``meta.json`` (analyzer settings, stop words, shapes),
+    ``coef.npy``/``intercept.npy``/``classes.npy``/``idf.npy`` and the
+    vocabulary as one UTF-8 blob (``vocab.bin``) sorted by bytes, with
+    ``vocab_offsets.npy``, ``vocab_columns.npy`` and ``vocab_positions.npy``
+    mapping between blob positions and feature columns.
+
+    A hashed vectorizer has no vocabulary: only ``idf.npy`` and its
+    parameters are written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if getattr(vectorizer, "hashed", False):
+        return _export_hashed(model, vectorizer, out_dir)
+
+    terms = sorted(vectorizer.vocabulary_.items(), key=lambda item: item[0].encode("utf-8"))
+    encoded = [term.encode("utf-8") for term, _ in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(out_dir, "vocab.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(out_dir, "vocab_offsets.npy"), offsets)
+    columns = np.array([col for _, col in terms], dtype=np.int64)
+    np.save(os.path.join(out_dir, "vocab_columns.npy"), columns)
+    np.save(os.path.join(out_dir, "vocab_positions.npy"), np.argsort(columns))
+
+    np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    _export_linear_model(model, out_dir)
+
+    stop_words = vectorizer.get_stop_words()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_features": len(encoded),
+        "vectorizer": {
+            "analyzer": vectorizer.analyzer,
+            "lowercase": vectorizer.lowercase,
+            "strip_accents": vectorizer.strip_accents,
+            "token_pattern": vectorizer.token_pattern,
+            "ngram_range": list(vectorizer.ngram_range),
+            "stop_words": sorted(stop_words) if stop_words else None,
+            "binary": vectorizer.binary,
+            "norm": vectorizer.norm,
+            "use_idf": vectorizer.use_idf,
+            "sublinear_tf": vectorizer.sublinear_tf,
+        },
+    }
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+def _export_linear_model(model, out_dir: str):
+    np.save(os.path.join(out_dir, "coef.npy"), np.asarray(model.coef_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(model.intercept_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "classes.npy"), np.asarray(model.classes_))
+
+
+def _export_hashed(model, vectorizer, out_dir: str) -> str:
+    np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    _export_linear_model(model, out_dir)
+    meta = {
+        "format_version": HASHED_FORMAT_VERSION,
+        "n_features": vectorizer.n_features,
+        "vectorizer": {"analyzer": "hashed", **vectorizer.get_params()},
+    }
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+def has_artifacts(path: str) -> bool:
+    return bool(path) and os.path.isfile(os.path.join(path, META_FILE))
+
+
+# ---------- Versioned layout ----------
+# <root>/<version>/ holds one export; <root>/CURRENT names the live version.
+def current_version(root: str):
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def artifact_path(root: str, version: str) -> str:
+    return os.path.join(root, version)
+
+
+def set_current(root: str, version: str):
+    if os.path.basename(version) != version or not has_artifacts(artifact_path(root, version)):
+        raise FileNotFoundError(f"No artifacts for version {version!r} in {root}")
+    tmp = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+def list_versions(root: str):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if has_artifacts(artifact_path(root, name)))
+
+
+def publish_artifacts(model, vectorizer, root: str, version: str = None, keep: int = 5) -> str:
+    # Export into a hidden staging directory and rename it into place, so a
+    # watcher can never observe a half-written version.
+    version = version or time.strftime("%Y%m%d-%H%M%S")
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f".staging-{version}")
+    shutil.rmtree(staging, ignore_errors=True)
+    export_artifacts(model, vectorizer, staging)
+    os.rename(staging, artifact_path(root, version))
+    set_current(root, version)
+
+    # Retain the `keep` most recent previous versions for quick rollback.
+    if keep:
+        for old in [v for v in list_versions(root) if v != version][:-keep]:
+            shutil.rmtree(artifact_path(root, old), ignore_errors=True)
+    return version
+
+
+# ---------- Read-only mapped vocabulary ----------
+class MappedVocabulary:
+    """Sorted UTF-8 term blob searched in place; nothing is unpickled or copied."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "vocab.bin"), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._offsets = np.load(os.path.join(path, "vocab_offsets.npy"), mmap_mode="r")
+        self._columns = np.load(os.path.join(path, "vocab_columns.npy"), mmap_mode="r")
+        self._positions = np.load(os.path.join(path, "vocab_positions.npy"), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _term_at(self, position: int) -> bytes:
+        return self._blob[int(self._offsets[position]):int(self._offsets[position + 1])]
+
+    def get(self, term: str, default=None):
+        key = term.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._term_at(lo) == key:
+            return int(self._columns[lo])
+        return default
+
+    def term(self, column: int) -> str:
+        return self._term_at(int(self._positions[column])).decode("utf-8")
+
+
+class FeatureNames:
+    """Sequence view of the vocabulary in column order, decoded on access."""
+
+    def __init__(self, vocabulary: MappedVocabulary):
+        self._vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    def __getitem__(self, column):
+        return self._vocabulary.term(column)
+
+    def __iter__(self):
+        return (self._vocabulary.term(i) for i in range(len(self)))
+
+
+# ---------- Vectorizer ----------
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+
+def _strip_accents_unicode(s: str) -> str:
+    normalized = unicodedata.normalize("NFKD", s)
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ASCII", "ignore").decode("ASCII")
+
+
+class MappedVectorizer:
+    """Reproduces ``TfidfVectorizer.transform`` from exported artifacts."""
+
+    def __init__(self, path: str, meta: dict):
+        params = meta["vectorizer"]
+        self.vocabulary = MappedVocabulary(path)
+        self.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode="r")
+        self.analyzer = params["analyzer"]
+        self.lowercase = params["lowercase"]
+        self.strip_accents = {
+            None: None,
+            "ascii": _strip_accents_ascii,
+            "unicode": _strip_accents_unicode,
+        }[params["strip_accents"]]
+        self.token_re = re.compile(params["token_pattern"])
+        self.min_n, self.max_n = params["ngram_range"]
+        self.stop_words = frozenset(params["stop_words"] or ())
+        self.binary = params["binary"]
+        self.norm = params["norm"]
+        self.use_idf = params["use_idf"]
+        self.sublinear_tf = params["sublinear_tf"]
+
+    def get_feature_names_out(self):
+        return FeatureNames(self.vocabulary)
+
+    def _preprocess(self, doc: str) -> str:
+        if self.lowercase:
+            doc = doc.lower()
+        if self.strip_accents is not None:
+            doc = self.strip_accents(doc)
+        return doc
+
+    def _word_ngrams(self, tokens):
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        if self.max_n == 1:
+            return tokens
+        original = tokens
+        grams = list(original) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), min(self.max_n, len(original)) + 1):
+            grams.extend(" ".join(original[i:i + n]) for i in range(len(original) - n + 1))
+        return grams
+
+    def _char_ngrams(self, text: str):
+        text = _WHITE_SPACES.sub(" ", text)
+        grams = []
+        for n in range(self.min_n, min(self.max_n, len(text)) + 1):
+            grams.extend(text[i:i + n] for i in range(len(text) - n + 1))
+        return grams
+
+    def _char_wb_ngrams(self, text: str):
+        grams = []
+        for word in _WHITE_SPACES.sub(" ", text).split():
+            word = f" {word} "
+            for n in range(self.min_n, self.max_n + 1):
+                offset = 0
+                grams.append(word[offset:offset + n])
+                while offset + n < len(word):
+                    offset += 1
+                    grams.append(word[offset:offset + n])
+                if offset == 0:
+                    break
+        return grams
+
+    def analyze(self, doc: str):
+        doc = self._preprocess(doc)
+        if self.analyzer == "char":
+            return self._char_ngrams(doc)
+        if self.analyzer == "char_wb":
+            return self._char_wb_ngrams(doc)
+        return self._word_ngrams(self.token_re.findall(doc))
+
+    def transform(self, docs):
+        indptr = [0]
+        indices = []
+        data = []
+        lookup = self.vocabulary.get
+        for doc in docs:
+            counts = {}
+            for gram in self.analyze(doc):
+                column = lookup(gram)
+                if column is not None:
+                    counts[column] = counts.get(column, 0) + 1
+            columns = sorted(counts)
+            values = np.array([counts[c] for c in columns], dtype=np.float64)
+            if self.binary:
+                values[:] = 1.0
+            elif self.sublinear_tf:
+                values = np.log(values) + 1.0
+            if self.use_idf and columns:
+                values *= self.idf[columns]
+            if self.norm == "l2" and len(values):
+                values /= math.sqrt(float(np.dot(values, values))) or 1.0
+            elif self.norm == "l1" and len(values):
+                values /= float(np.abs(values).sum()) or 1.0
+            indices.extend(columns)
+            data.extend(values.tolist())
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, len(self.vocabulary)),
+        )
+
+
+# ---------- Linear model ----------
+class MappedLinearModel:
+    """``predict_proba`` for a logistic regression over mapped coefficients."""
+
+    def __init__(self, path: str):
+        self.coef_ = np.load(os.path.join(path, "coef.npy"), mmap_mode="r")
+        self.intercept_ = np.load(os.path.join(path, "intercept.npy"), mmap_mode="r")
+        self.classes_ = np.load(os.path.join(path, "classes.npy"))
+
+    def decision_function(self, X):
+        scores = X @ np.asarray(self.coef_).T + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            p = 1.0 / (1.0 + np.exp(-scores))
+            return np.column_stack([1.0 - p, p])
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def load_artifacts(path: str):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") == HASHED_FORMAT_VERSION:
+        params = dict(meta["vectorizer"])
+        params.pop("analyzer", None)
+        vectorizer = HashedTextVectorizer(**params)
+        vectorizer.idf_ = np.load(os.path.join(path, "idf.npy"), mmap_mode="r")
+        return MappedLinearModel(path), vectorizer
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format: {meta.get('format_version')}")
+    return MappedLinearModel(path), MappedVectorizer(path, meta)
@@ -0,0 +1,149 @@
+"""ASGI entry point: ``uvicorn asgi:app --host 0.0.0.0 --port 8000``.
+
+``POST /api/analyze`` is served natively: the CPU-bound scoring stage runs in
+a thread or process pool (``ASGI_CPU_POOL``) and the LLM call is awaited, so
+one process keeps many requests in flight. Every other route is handed to the
+Flask app through an ASGI/WSGI bridge.
+"""
+import asyncio
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import Headers
+
+import app as wsgi
+
+
+CPU_POOL = os.getenv("ASGI_CPU_POOL", "thread")
+CPU_WORKERS = int(os.getenv("ASGI_CPU_WORKERS", str(os.cpu_count() or 1)))
+
+
+def make_cpu_pool():
+    if CPU_POOL == "process":
+        # Children import app.py themselves and map the same artifact files,
+        # so the model pages are shared rather than copied.
+        return ProcessPoolExecutor(max_workers=CPU_WORKERS)
+    return ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="score")
+
+
+async def explain_result(message: str, scam_type: str, probability: int, highlights: list):
+    args = (message, scam_type, probability, highlights)
+    metrics = wsgi.metrics
+    cached = wsgi.explanation_cache.get(*args[:3])
+    if cached:
+        metrics.inc(metrics.explanations, "cache")
+        return cached
+    with metrics.span("llm"):
+        explanation = await wsgi.explainer.aexplain(
+            *args, on_result=lambda explanation: wsgi.explanation_cache.set(*args[:3], explanation)
+        )
+    metrics.inc(metrics.explanations, "llm" if explanation else "fallback")
+    return explanation
+
+
+async def analyze_message(pool, message: str, followup_answers: dict = None, followup_submitted: bool = False,
+                          defer_explanation: bool = False, reason_ids: bool = False, explain: bool = True) -> dict:
+    loop = asyncio.get_running_loop()
+
+    async def score(message, followup_answers, followup_submitted, reason_ids, snapshot):
+        # The snapshot stays behind: a process pool scores with its own, and
+        # hands its stage timings back to be recorded here.
+        result, spans = await loop.run_in_executor(pool, functools.partial(
+            wsgi.score_stage_captured, message, followup_answers, followup_submitted, reason_ids
+        ))
+        wsgi.metrics.replay(spans)
+        return result
+
+    steps = wsgi.analysis_steps(message, followup_answers, followup_submitted, defer_explanation, reason_ids,
+                                explain)
+    return await wsgi.arun_steps(steps, {"score": score, "llm": explain_result})
+
+
+# ---------- ASGI plumbing ----------
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        event = await receive()
+        body += event.get("body", b"")
+        if not event.get("more_body"):
+            return body
+
+
+async def send_json(send, status: int, payload: dict, headers=(), accept_encoding: str = ""):
+    raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), *headers]
+    if wsgi.app.config["COMPRESS_MIN_SIZE"] >= 0:
+        raw, encoding = wsgi.compress(raw, accept_encoding, wsgi.app.config["COMPRESS_MIN_SIZE"],
+                                      wsgi.app.config["COMPRESS_LEVEL"])
+        headers.append((b"vary", b"Accept-Encoding"))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [*headers, (b"content-length", str(len(raw)).encode())],
+    })
+    await send({"type": "http.response.body", "body": raw})
+
+
+class AnalyzeApp:
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.pool = None
+
+    async def lifespan(self, receive, send):
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                self.pool = make_cpu_pool()
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                if self.pool is not None:
+                    self.pool.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] == "http" and scope["path"] == "/api/analyze" and scope["method"] == "POST":
+            if self.pool is None:
+                self.pool = make_cpu_pool()
+            headers = Headers([(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope.get("headers", [])])
+            retry_after = wsgi.check_rate_limit(wsgi.client_key(headers, (scope.get("client") or [None])[0]))
+            if retry_after is not None:
+                return await send_json(
+                    send, 429, {"error": "Rate limit exceeded", "retry_after": round(retry_after, 2)},
+                    headers=[(b"retry-after", wsgi.retry_after_header(retry_after).encode())],
+                )
+            try:
+                data = json.loads(await read_body(receive) or b"{}")
+            except ValueError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            accept_encoding = headers.get("Accept-Encoding", "")
+            try:
+                query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+                schema, fields = wsgi.response_options(data, query)
+            except ValueError as exc:
+                return await send_json(send, 400, {"error": str(exc)}, accept_encoding=accept_encoding)
+            result = await analyze_message(
+                self.pool,
+                (data.get("message") or "").strip(),
+                followup_answers=data.get("followup_answers") or {},
+                followup_submitted=bool(data.get("followup_submitted")),
+                defer_explanation=bool(data.get("defer_explanation")),
+                reason_ids=schema == 2 or bool(data.get("reason_ids")),
+                explain=wsgi.wants_explanation(fields),
+            )
+            return await send_json(send, 200, wsgi.render_result(result, schema, fields),
+                                   accept_encoding=accept_encoding)
+        return await self.fallback(scope, receive, send)
+
+
+app = AnalyzeApp(WsgiToAsgi(wsgi.app))
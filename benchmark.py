@@ -0,0 +1,328 @@
+"""Benchmarks for the analyze pipeline.
+
+Suites:
+  micro     predict_proba_class1, top_contributing_words, get_word_reason
+  client    POST /api/analyze through Flask's test client (no network)
+  gunicorn  POST /api/analyze against a real gunicorn instance over HTTP
+
+Messages are replayed from spam.csv and requests.jsonl; the LLM is the local
+stand-in from fake_llm.py, so results do not depend on the Groq API. Results
+are written as JSON; pass ``--baseline`` to compare against an earlier run.
+
+    python benchmark.py --out bench.json
+    python benchmark.py --suites micro,client --baseline bench.json
+"""
+import argparse
+import csv
+import http.client
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fake_llm import serve as serve_fake_llm
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---------- Corpus ----------
+def load_corpus(spam_path: str, requests_path: str, limit: int, seed: int):
+    messages = []
+    if os.path.exists(spam_path):
+        with open(spam_path, encoding="latin-1", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            messages.extend(row[1] for row in reader if len(row) >= 2 and row[1].strip())
+    if os.path.exists(requests_path):
+        with open(requests_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    messages.append(f"{entry.get('title', '')}. {entry.get('body', '')}".strip())
+    random.Random(seed).shuffle(messages)
+    return messages[:limit] if limit else messages
+
+
+# ---------- Stats ----------
+def summarize(timings, elapsed: float = None) -> dict:
+    ms = np.asarray(timings, dtype=np.float64) * 1000.0
+    summary = {
+        "count": int(len(ms)),
+        "mean_ms": float(ms.mean()) if len(ms) else None,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p95_ms": float(np.percentile(ms, 95)) if len(ms) else None,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+    }
+    if elapsed:
+        summary["throughput_rps"] = len(ms) / elapsed
+    return summary
+
+
+def proc_memory(pid: int) -> dict:
+    # Linux only: RSS counts mapped model pages in every worker, PSS splits
+    # shared pages between the processes that map them.
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss_kb"] = int(line.split()[1])
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    memory["pss_kb"] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def child_pids(parent: int):
+    pids = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", encoding="utf-8") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(name))
+    return sorted(pids)
+
+
+# ---------- Suites ----------
+def bench_micro(messages, repeats: int) -> dict:
+    import app
+    from reasons import get_word_reason
+
+    words = sorted({w for m in messages for w in m.lower().split()})
+    results = {}
+    for name, fn, inputs in [
+        ("predict_proba_class1", app.predict_proba_class1, messages),
+        ("top_contributing_words", app.top_contributing_words, messages),
+        ("get_word_reason", get_word_reason, words),
+    ]:
+        timings = []
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for value in inputs:
+                t = time.perf_counter()
+                fn(value)
+                timings.append(time.perf_counter() - t)
+        results[name] = summarize(timings, time.perf_counter() - started)
+    return results
+
+
+def bench_client(messages, concurrency: int) -> dict:
+    import app
+
+    client = app.app.test_client()
+    client.post("/api/analyze", json={"message": messages[0]})
+
+    def one(message):
+        t = time.perf_counter()
+        response = client.post("/api/analyze", json={"message": message})
+        return time.perf_counter() - t, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, messages))
+    elapsed = time.perf_counter() - started
+    result = summarize([t for t, _ in outcomes], elapsed)
+    result["errors"] = sum(1 for _, code in outcomes if code != 200)
+    result["concurrency"] = concurrency
+    result["rss"] = proc_memory(os.getpid())
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def bench_gunicorn(messages, concurrency: int, workers: int, threads: int, env: dict) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "--workers", str(workers),
+         "--worker-class", "gthread", "--threads", str(threads), "--bind", f"127.0.0.1:{port}",
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        if not wait_for_port(port, timeout=60):
+            raise RuntimeError("gunicorn did not start")
+        local = threading.local()
+
+        def one(message):
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            body = json.dumps({"message": message})
+            t = time.perf_counter()
+            try:
+                conn.request("POST", "/api/analyze", body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                local.conn = None
+                status = 0
+            return time.perf_counter() - t, status
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, messages[:concurrency]))
+            started = time.perf_counter()
+            outcomes = list(pool.map(one, messages))
+            elapsed = time.perf_counter() - started
+
+        result = summarize([t for t, _ in outcomes], elapsed)
+        result["errors"] = sum(1 for _, code in outcomes if code != 200)
+        result.update({"concurrency": concurrency, "workers": workers, "threads": threads})
+        result["worker_memory"] = {str(pid): proc_memory(pid) for pid in child_pids(server.pid)}
+        return result
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+# ---------- Baseline comparison ----------
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    rows = []
+    for suite, benches in current["results"].items():
+        base_suite = baseline.get("results", {}).get(suite, {})
+        entries = benches.items() if suite == "micro" else [(suite, benches)]
+        for name, stats in entries:
+            base = base_suite.get(name, {}) if suite == "micro" else base_suite
+            for key in COMPARED:
+                now, before = stats.get(key), base.get(key)
+                if not now or not before:
+                    continue
+                change = (now - before) / before
+                # Latency regresses upward, throughput downward.
+                worse = -change if key == "throughput_rps" else change
+                rows.append({
+                    "benchmark": name, "metric": key, "baseline": before, "current": now,
+                    "change": change, "regression": worse > tolerance,
+                })
+    return rows
+
+
+# ---------- CLI ----------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scam analysis pipeline.")
+    parser.add_argument("--suites", default="micro,client,gunicorn")
+    parser.add_argument("--spam", default=os.path.join(ROOT, "spam.csv"))
+    parser.add_argument("--requests", default=os.path.join(ROOT, "requests.jsonl"))
+    parser.add_argument("--messages", type=int, default=1000, help="messages replayed per suite (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the corpus in the micro suite")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="threads per gunicorn worker")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="fake LLM response time in seconds")
+    parser.add_argument("--llm-fail-rate", type=float, default=0.0)
+    parser.add_argument("--no-cache", action="store_true", help="disable score and explanation caches and campaign reuse")
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before flagging")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    messages = load_corpus(args.spam, args.requests, args.messages, args.seed)
+
+    fake = serve_fake_llm(port=0, delay=args.llm_delay, fail_rate=args.llm_fail_rate)
+    threading.Thread(target=fake.serve_forever, name="fake-llm", daemon=True).start()
+    # Set before app.py is imported, both here and in the gunicorn workers.
+    os.environ.update({
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{fake.server_address[1]}",
+        "MODEL_WATCH_INTERVAL": "0",
+        "ONLINE_LEARNING": "0",
+        # Every benchmark request comes from one client address.
+        "RATE_LIMIT_PER_MINUTE": "0",
+    })
+    if args.no_cache:
+        os.environ["CACHE_CAPACITY"] = "0"
+        # spam.csv repeats many messages, which campaign reuse would serve
+        # without scoring.
+        os.environ["CAMPAIGN_CAPACITY"] = "0"
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "results": {},
+    }
+    print(f"Replaying {len(messages)} messages; suites: {', '.join(suites)}")
+    try:
+        if "micro" in suites:
+            report["results"]["micro"] = bench_micro(messages, args.repeats)
+        if "client" in suites:
+            report["results"]["client"] = bench_client(messages, args.concurrency)
+        if "gunicorn" in suites:
+            report["results"]["gunicorn"] = bench_gunicorn(
+                messages, args.concurrency, args.workers, args.threads, dict(os.environ)
+            )
+    finally:
+        fake.shutdown()
+
+    for suite, benches in report["results"].items():
+        for name, stats in (benches.items() if suite == "micro" else [(suite, benches)]):
+            throughput = stats.get("throughput_rps")
+            print(f"  {name:<24} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms "
+                  f"p99={stats['p99_ms']:.3f}ms" + (f" {throughput:.0f} req/s" if throughput else ""))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "rows": rows}
+        regressions = [r for r in rows if r["regression"]]
+        for r in rows:
+            flag = "REGRESSION" if r["regression"] else ""
+            print(f"  {r['benchmark']:<24} {r['metric']:<15} {r['baseline']:>10.3f} -> {r['current']:>10.3f} "
+                  f"({r['change']:+.1%}) {flag}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
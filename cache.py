@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# ---------- Keys ----------
+# Devanagari vowel signs, virama and nukta are not \w to Python's re; they
+# are kept so "आपका" and "आपक" stay different words. Dandas still split.
+_NON_WORD_RE = re.compile(r"[^\w\u0900-\u0963\u0966-\u097f]+")
+
+
+def normalize_message(message: str) -> str:
+    # Case, punctuation and spacing never change word-analyzer TF-IDF
+    # tokens, so messages that only differ in those share one fingerprint.
+    # Char n-gram analyzers do see them; see ScoringEngine.fingerprint.
+    return _NON_WORD_RE.sub(" ", message.lower()).strip()
+
+
+def fingerprint(message: str, normalize: bool = True) -> str:
+    if normalize:
+        message = normalize_message(message)
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def probability_bucket(probability: int, width: int = 10) -> int:
+    return int(probability) // width
+
+
+def explanation_key(message: str, scam_type: str, probability: int) -> str:
+    return f"{fingerprint(message)}|{scam_type}|{probability_bucket(probability)}"
+
+
+# ---------- In-process LRU ----------
+class LRUCache:
+    def __init__(self, capacity: int = 4096, ttl: float = 3600.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.capacity <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        return {
+            "backend": "memory",
+            "size": size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# ---------- SQLite backend (shared across workers) ----------
+class SQLiteCache:
+    def __init__(self, path: str, capacity: int = 100000, ttl: float = 86400.0):
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.capacity
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# ---------- Explanation cache ----------
+class ExplanationCache:
+    """In-process LRU in front of an optional SQLite store shared by workers."""
+
+    def __init__(self, capacity: int = 4096, ttl: float = 3600.0, db_path: str = None):
+        self.memory = LRUCache(capacity=capacity, ttl=ttl)
+        self.shared = SQLiteCache(db_path, ttl=ttl) if db_path else None
+
+    def get(self, message: str, scam_type: str, probability: int):
+        key = explanation_key(message, scam_type, probability)
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, message: str, scam_type: str, probability: int, explanation: dict):
+        key = explanation_key(message, scam_type, probability)
+        self.memory.set(key, explanation)
+        if self.shared is not None:
+            self.shared.set(key, explanation)
+
+    def stats(self) -> dict:
+        stats = {"memory": self.memory.stats()}
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
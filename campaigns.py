@@ -0,0 +1,201 @@
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+from cache import normalize_message
+
+
+# ---------- Shingling & MinHash ----------
+_NUMBER_RE = re.compile(r"\d+")
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+
+def shingles(message: str, k: int = 2) -> set:
+    # Numbers are masked so "earn 800 daily" and "earn 1000 daily" shingle
+    # identically; word pairs keep enough order to separate unrelated texts.
+    tokens = _NUMBER_RE.sub("0", normalize_message(message)).split()
+    if len(tokens) <= k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def mask_numbers(message: str) -> str:
+    # Examples are shown to operators; digits are where OTPs, account and
+    # card numbers live.
+    return _NUMBER_RE.sub(lambda m: "#" * len(m.group()), message)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        # a < 2**31 and x < 2**32 keep a * x + b inside uint64.
+        self.a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return None
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64,
+                        count=len(shingle_set))
+        return ((np.outer(x, self.a) + self.b) % _PRIME).min(axis=0)
+
+
+# ---------- Campaign index ----------
+CampaignMatch = namedtuple("CampaignMatch", ["campaign_id", "similarity", "reusable", "verdict", "explanation"])
+
+
+class _Entry:
+    __slots__ = ("entry_id", "signature", "campaign_id", "verdict", "explanation", "model_version")
+
+    def __init__(self, entry_id, signature, campaign_id, verdict, explanation, model_version):
+        self.entry_id = entry_id
+        self.signature = signature
+        self.campaign_id = campaign_id
+        self.verdict = verdict
+        self.explanation = explanation
+        self.model_version = model_version
+
+
+class CampaignIndex:
+    """MinHash/LSH index over recently analysed messages.
+
+    Signatures are split into ``bands`` of equal rows; messages sharing any
+    band land in the same bucket, and only those candidates are compared, so
+    a lookup touches a handful of entries whatever the index size. Messages
+    at or above ``cluster_threshold`` estimated Jaccard similarity join the
+    matched campaign; at ``reuse_threshold`` (and the same model version) the
+    stored verdict and explanation can be returned without rescoring.
+    """
+
+    def __init__(self, capacity: int = 10000, num_perm: int = 64, bands: int = 16,
+                 cluster_threshold: float = 0.5, reuse_threshold: float = 0.9, max_examples: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.cluster_threshold = cluster_threshold
+        self.reuse_threshold = reuse_threshold
+        self.max_examples = max_examples
+        self.hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._campaigns = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _best(self, signature):
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        best, best_similarity = None, 0.0
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            similarity = float(np.count_nonzero(entry.signature == signature)) / len(signature)
+            if similarity > best_similarity:
+                best, best_similarity = entry, similarity
+        return best, best_similarity
+
+    def _insert(self, signature, campaign_id, verdict, explanation, model_version):
+        entry = _Entry(self._next_id, signature, campaign_id, verdict, explanation, model_version)
+        self._next_id += 1
+        self._entries[entry.entry_id] = entry
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(entry.entry_id)
+        while len(self._entries) > self.capacity:
+            _, old = self._entries.popitem(last=False)
+            for key in self._band_keys(old.signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(old.entry_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def _touch_campaign(self, campaign_id, message: str, verdict: dict, new_variant: bool):
+        now = time.time()
+        campaign = self._campaigns.get(campaign_id)
+        if campaign is None:
+            campaign = self._campaigns[campaign_id] = {
+                "campaign_id": campaign_id, "size": 0, "variants": 0, "first_seen": now, "last_seen": now,
+                "examples": deque(maxlen=self.max_examples),
+            }
+        campaign["size"] += 1
+        campaign["last_seen"] = now
+        if new_variant:
+            campaign["variants"] += 1
+            campaign["examples"].append(mask_numbers(message))
+        for field in ("status", "probability", "risk_level", "scam_type"):
+            if verdict.get(field) is not None:
+                campaign[field] = verdict[field]
+        self._campaigns.move_to_end(campaign_id)
+        while len(self._campaigns) > self.capacity:
+            self._campaigns.popitem(last=False)
+
+    def lookup(self, message: str, model_version: str = None):
+        signature = self.hasher.signature(shingles(message))
+        if signature is None:
+            return None
+        with self._lock:
+            entry, similarity = self._best(signature)
+            if entry is None or similarity < self.cluster_threshold:
+                return None
+            reusable = (similarity >= self.reuse_threshold and entry.verdict is not None
+                        and entry.model_version == model_version)
+            return CampaignMatch(entry.campaign_id, similarity, reusable, entry.verdict, entry.explanation)
+
+    def add(self, message: str, verdict: dict, explanation: dict = None, model_version: str = None):
+        """Record an analysed message and return its campaign id."""
+        signature = self.hasher.signature(shingles(message))
+        if signature is None:
+            return None
+        with self._lock:
+            entry, similarity = self._best(signature)
+            if entry is not None and similarity >= self.cluster_threshold:
+                campaign_id = entry.campaign_id
+            else:
+                campaign_id = uuid.uuid4().hex[:12]
+            duplicate = (entry is not None and similarity >= self.reuse_threshold
+                         and entry.model_version == model_version)
+            if duplicate:
+                # Same variant again: refresh the stored answer instead of
+                # growing the index with copies.
+                entry.verdict = verdict
+                entry.explanation = explanation or entry.explanation
+            else:
+                self._insert(signature, campaign_id, verdict, explanation, model_version)
+            self._touch_campaign(campaign_id, message, verdict, new_variant=not duplicate)
+        return campaign_id
+
+    def hit(self, campaign_id: str, message: str, verdict: dict):
+        with self._lock:
+            self._touch_campaign(campaign_id, message, verdict, new_variant=False)
+
+    def campaigns(self, min_size: int = 2, limit: int = 50):
+        with self._lock:
+            rows = [dict(c, examples=list(c["examples"])) for c in self._campaigns.values() if c["size"] >= min_size]
+        rows.sort(key=lambda c: (-c["size"], -c["last_seen"]))
+        return rows[:limit]
+
+    def campaign(self, campaign_id: str):
+        with self._lock:
+            c = self._campaigns.get(campaign_id)
+            return dict(c, examples=list(c["examples"])) if c else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "campaigns": len(self._campaigns),
+                "buckets": len(self._buckets),
+                "capacity": self.capacity,
+                "cluster_threshold": self.cluster_threshold,
+                "reuse_threshold": self.reuse_threshold,
+            }
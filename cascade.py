@@ -0,0 +1,73 @@
+import math
+import threading
+
+import numpy as np
+
+
+# ---------- Tier 0: bound-based pre-filter ----------
+class Prefilter:
+    """Cheap upper bound on the full model's class-1 probability.
+
+    A TF-IDF row is non-negative with unit L2 norm, so its dot product with
+    the class-1 weights can never exceed the L2 norm of the positive weights
+    of the terms it contains. Summing squared weights from a hash table over
+    the analyzer's output therefore gives ``p_max`` without vectorizing, and
+    a message whose ``p_max`` is below the clear threshold is provably one the
+    full model would also call low-risk. Hashed vectorizers skip the term
+    table and index a dense array of squared weights by column instead.
+    """
+
+    def __init__(self, engine):
+        vectorizer = engine.vectorizer
+        self.supported = engine.binary and getattr(vectorizer, "norm", None) == "l2"
+        self.intercept = engine.intercept
+        self.squared = {}
+        self.hashed = engine.hashed
+        if not self.supported:
+            return
+        weights = np.asarray(engine.weights)
+        if self.hashed:
+            self.feature_columns = vectorizer.feature_columns
+            self.squared_by_column = np.where(weights > 0, weights, 0.0) ** 2
+            return
+        self.analyze = getattr(vectorizer, "analyze", None) or vectorizer.build_analyzer()
+        names = engine.feature_names
+        for column in np.flatnonzero(weights > 0):
+            self.squared[str(names[column])] = float(weights[column]) ** 2
+
+    def upper_bound(self, message: str):
+        if not self.supported:
+            return None
+        if self.hashed:
+            columns = list(self.feature_columns(message))
+            total = float(self.squared_by_column[columns].sum()) if columns else 0.0
+        else:
+            squared = self.squared
+            total = sum(squared.get(term, 0.0) for term in set(self.analyze(message)))
+        z = self.intercept + math.sqrt(total)
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+
+# ---------- Tier accounting ----------
+class TierStats:
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str):
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def stats(self) -> dict:
+        counts = self.counts()
+        scored = counts.get("prefilter_cleared", 0) + counts.get("full_model", 0)
+        explained = counts.get("llm", 0) + counts.get("llm_skipped", 0)
+        return {
+            "counts": counts,
+            "prefilter_clear_rate": counts.get("prefilter_cleared", 0) / scored if scored else None,
+            "llm_rate": counts.get("llm", 0) / explained if explained else None,
+        }
@@ -0,0 +1,234 @@
+"""URL, domain, UPI and phone-number extraction with a local reputation store.
+
+Blocklist files hold one entity per line, optionally prefixed with its type
+(``domain:``, ``phone:``, ``upi:``); ``#`` starts a comment. Untyped lines are
+classified by shape. Large lists can be compiled once into a ``.bloom`` file:
+
+    python entities.py build blocklist.txt -o blocklist.bloom
+"""
+import argparse
+import hashlib
+import math
+import re
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+
+SHORTENER_DOMAINS = frozenset({
+    "bit.ly", "tinyurl.com", "goo.gl", "t.co", "cutt.ly", "is.gd", "rb.gy", "ow.ly", "shorturl.at",
+    "tiny.cc", "rebrand.ly", "t.ly", "s.id", "v.gd", "bitly.com", "tinyurl.in", "shorte.st", "clck.ru",
+})
+
+_TLDS = "com|in|net|org|info|xyz|top|live|site|online|club|shop|link|click|ly|co|io|me|cc|tk|ml|ga|cf|gq|app|biz"
+
+ENTITY_RE = re.compile(
+    r"(?P<url>\b(?:https?://|www\.)[^\s<>\"']+)"
+    r"|(?P<upi>\b[a-z0-9][a-z0-9._-]{1,255}@[a-z][a-z0-9]{1,63}\b(?![.@]\w))"
+    r"|(?P<domain>\b(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?:" + _TLDS + r")\b(?:/[^\s<>\"']*)?)"
+    r"|(?P<phone>(?<![\w+(])(?:\+|00|\()?\d[\d\s().-]{6,16}\d(?!\w))",
+    re.IGNORECASE,
+)
+
+Entity = namedtuple("Entity", ["kind", "text", "value"])
+
+
+# ---------- Normalisation ----------
+def domain_of(url: str) -> str:
+    url = re.sub(r"^[a-z]+://", "", url.lower())
+    host = re.split(r"[/?#]", url, 1)[0].rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_phone(text: str):
+    digits = re.sub(r"\D", "", text)
+    if text.lstrip().startswith("00"):
+        digits = digits[2:]
+    if len(digits) == 10 and digits[0] in "6789":
+        return "91" + digits
+    if len(digits) == 11 and digits[0] == "0":
+        return "91" + digits[1:]
+    return digits if 7 <= len(digits) <= 15 else None
+
+
+_DATE_RE = re.compile(r"\d{1,4}[./-]\d{1,2}[./-]\d{1,4}")
+
+
+def plausible_phone(text: str) -> bool:
+    """Phone-shaped rather than a date or a run of amounts.
+
+    Without a ``+``/``00`` prefix only Indian shapes pass: a 10-digit mobile,
+    a 0-prefixed 11-digit number or 91 plus a mobile.
+    """
+    if _DATE_RE.search(text):
+        return False
+    digits = re.sub(r"\D", "", text)
+    if text.startswith("+"):
+        return 8 <= len(digits) <= 15
+    if text.startswith("00"):
+        return 8 <= len(digits) - 2 <= 15
+    if len(digits) == 10:
+        return digits[0] in "6789"
+    if len(digits) == 11:
+        return digits[0] == "0"
+    if len(digits) == 12:
+        return digits.startswith("91") and digits[2] in "6789"
+    return False
+
+
+def normalize(kind: str, value: str):
+    value = value.strip()
+    if kind in ("url", "domain"):
+        return domain_of(value) or None
+    if kind == "phone":
+        return normalize_phone(value)
+    return value.lower()
+
+
+def classify_entry(entry: str):
+    if ":" in entry and entry.split(":", 1)[0] in ("domain", "phone", "upi", "url"):
+        kind, value = entry.split(":", 1)
+        return ("domain" if kind == "url" else kind), value
+    if "@" in entry:
+        return "upi", entry
+    if re.fullmatch(r"[\d\s()+.-]+", entry):
+        return "phone", entry
+    return "domain", entry
+
+
+def extract_entities(message: str):
+    """One regex pass; returns unique entities in order of appearance."""
+    entities = []
+    seen = set()
+    for m in ENTITY_RE.finditer(message):
+        kind = m.lastgroup
+        text = m.group(kind).rstrip(".,;:!?)")
+        if kind == "phone" and not plausible_phone(text):
+            continue
+        value = normalize(kind, text)
+        if not value:
+            continue
+        if kind in ("url", "domain") and value in SHORTENER_DOMAINS:
+            kind = "shortlink"
+        elif kind == "url":
+            kind = "domain"
+        if (kind, value) not in seen:
+            seen.add((kind, value))
+            entities.append(Entity(kind, text, value))
+    return entities
+
+
+# ---------- Bloom filter ----------
+class BloomFilter:
+    def __init__(self, size_bits: int, num_hashes: int, bits=None, count: int = 0):
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.bits = bits if bits is not None else np.zeros((size_bits + 7) // 8, dtype=np.uint8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        # A floor on the size keeps tiny lists from aliasing the k probes.
+        size_bits = max(8192, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        return cls(size_bits, max(1, int(round(-math.log2(error_rate)))))
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez(f, bits=self.bits, params=np.array([self.size_bits, self.num_hashes, self.count], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            size_bits, num_hashes, count = (int(v) for v in data["params"])
+            return cls(size_bits, num_hashes, bits=data["bits"], count=count)
+
+
+# ---------- Reputation store ----------
+class ReputationStore:
+    """Known-bad domains, phone numbers and UPI IDs behind one Bloom filter.
+
+    Keys are ``kind:normalized-value``; a domain also matches through any of
+    its parent domains, so blocklisting ``evil.com`` covers ``pay.evil.com``.
+    Lookups are a fixed number of bit probes and never touch the network.
+    """
+
+    def __init__(self, bloom: BloomFilter, source: str = None):
+        self.bloom = bloom
+        self.source = source
+
+    @staticmethod
+    def _keys(kind: str, value: str):
+        if kind in ("domain", "shortlink"):
+            labels = value.split(".")
+            return [f"domain:{'.'.join(labels[i:])}" for i in range(len(labels) - 1)]
+        return [f"{kind}:{value}"]
+
+    @classmethod
+    def from_lines(cls, lines, source: str = None, error_rate: float = 0.001):
+        keys = []
+        for line in lines:
+            entry = line.split("#", 1)[0].strip()
+            if not entry:
+                continue
+            kind, raw = classify_entry(entry)
+            value = normalize(kind, raw)
+            if value:
+                keys.append(f"{kind}:{value}")
+        bloom = BloomFilter.for_capacity(len(keys), error_rate)
+        for key in keys:
+            bloom.add(key)
+        return cls(bloom, source)
+
+    @classmethod
+    def load(cls, path: str):
+        if path.endswith(".bloom"):
+            return cls(BloomFilter.load(path), path)
+        with open(path, encoding="utf-8") as f:
+            return cls.from_lines(f, source=path)
+
+    def is_blocked(self, entity: Entity) -> bool:
+        return any(key in self.bloom for key in self._keys(entity.kind, entity.value))
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "entries": self.bloom.count,
+            "size_bytes": int(self.bloom.bits.nbytes),
+            "num_hashes": self.bloom.num_hashes,
+        }
+
+
+def build_bloom(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a blocklist into a Bloom filter file.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("blocklist")
+    parser.add_argument("-o", "--output", required=True, help="output path ending in .bloom")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args(argv)
+    with open(args.blocklist, encoding="utf-8") as f:
+        store = ReputationStore.from_lines(f, source=args.blocklist, error_rate=args.error_rate)
+    store.bloom.save(args.output)
+    print(f"✓ {store.bloom.count} entries -> {args.output} ({store.bloom.bits.nbytes / 1024:.1f} KiB, "
+          f"{store.bloom.num_hashes} hashes)")
+
+
+if __name__ == "__main__":
+    build_bloom(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""Local stand-in for the Groq chat completions API.
+
+Point the app at it with ``GROQ_BASE_URL=http://127.0.0.1:8090`` and any
+non-empty ``GROQ_API_KEY``.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CANNED_EXPLANATION = {
+    "scam_goal": "Wants you to hand over money or account access by acting before you think.",
+    "what_to_do": "Do not reply or click any link. Block the sender and report the message.",
+    "how_to_avoid": "Verify offers through official channels and never share OTPs or PINs.",
+}
+
+
+def make_handler(delay: float, fail_rate: float):
+    class FakeGroqHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            if delay:
+                time.sleep(delay)
+            if fail_rate and random.random() < fail_rate:
+                self._send_json(503, {"error": {"message": "fake upstream failure"}})
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(CANNED_EXPLANATION)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    return FakeGroqHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8090, delay: float = 0.0, fail_rate: float = 0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(delay, fail_rate))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to sleep before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of calls answered with 503")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.delay, args.fail_rate)
+    print(f"Fake Groq API listening on http://{args.host}:{args.port}")
+    server.serve_forever()
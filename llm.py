@@ -0,0 +1,303 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from groq import AsyncGroq, Groq
+
+
+PROMPT_TEMPLATE = """You are a cybersecurity AI assistant specializing in scam detection in India.
+Message: \"\"\"{message}\"\"\"
+ML Results: Scam Type: {scam_type}, Risk: {probability}%, Flagged words: {flagged}
+
+Reply ONLY in this JSON format with no extra text:
+{{
+  "scam_goal": "1-2 sentences on what this scam wants",
+  "what_to_do": "2-3 specific actions to take now",
+  "how_to_avoid": "2-3 tips to avoid this scam"
+}}"""
+
+
+def build_prompt(message: str, scam_type: str, probability: int, highlights: list) -> str:
+    flagged = ", ".join([f'"{w}" (impact {s:.2f})' for w, s, r in highlights[:5]])
+    return PROMPT_TEMPLATE.format(message=message, scam_type=scam_type, probability=probability, flagged=flagged)
+
+
+def parse_explanation(raw: str) -> dict:
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+    return json.loads(raw.strip())
+
+
+# ---------- Circuit breaker ----------
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            # Half-open: let exactly one trial call through.
+            self._trial_in_flight = True
+            return True
+
+    def cancel_trial(self):
+        # A caller that was allowed through but never made the call hands the
+        # half-open trial back, otherwise the breaker would stay open for good.
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+# ---------- Explanation service ----------
+class ExplanationService:
+    """Pooled Groq client behind a bounded executor and a circuit breaker.
+
+    Every entry point returns ``None`` instead of raising so callers can fall
+    back to the static explanation text right away.
+    """
+
+    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile", base_url: str = None,
+                 timeout: float = 8.0, max_workers: int = 4, max_pending: int = 16,
+                 breaker: CircuitBreaker = None, max_deferred: int = 1024, max_async: int = 64,
+                 admission=None, queue_timeout: float = 0.0):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url or None
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.max_deferred = max_deferred
+        if admission is not None:
+            # The gate is then the only bound: one worker per permit, so an
+            # admitted call is always running, never queued behind the pool.
+            max_workers, max_pending = admission.max_inflight, 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._deferred = OrderedDict()
+        self._deferred_lock = threading.Lock()
+        self.max_async = max_async
+        # Optional ratelimit gate, possibly shared with other workers; callers
+        # that find it full wait up to queue_timeout and are then shed.
+        self.admission = admission
+        self.queue_timeout = queue_timeout
+        self._async_client = None
+        self._async_in_flight = 0
+        self._outcomes = {}
+        self._outcomes_lock = threading.Lock()
+
+    @property
+    def client(self) -> Groq:
+        # One client per process: the underlying httpx pool keeps connections
+        # to the API warm between requests.
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = Groq(api_key=self.api_key, base_url=self.base_url,
+                                        timeout=self.timeout, max_retries=0)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        if self._async_client is None:
+            self._async_client = AsyncGroq(api_key=self.api_key, base_url=self.base_url,
+                                           timeout=self.timeout, max_retries=0)
+        return self._async_client
+
+    def _count(self, outcome: str):
+        with self._outcomes_lock:
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+
+    def stats(self) -> dict:
+        # Outcomes: ok, error, timeout, breaker_open, saturated, shed.
+        with self._outcomes_lock:
+            outcomes = dict(self._outcomes)
+        return {"outcomes": outcomes, "breaker": self.breaker.state, "async_in_flight": self._async_in_flight}
+
+    def _call(self, message: str, scam_type: str, probability: int, highlights: list):
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": build_prompt(message, scam_type, probability, highlights)}],
+                max_tokens=400,
+            )
+            result = parse_explanation(response.choices[0].message.content)
+        except Exception as exc:
+            self.breaker.record_failure()
+            self._count("error")
+            print(f"LLM ERROR: {exc}")
+            return None
+        self.breaker.record_success()
+        self._count("ok")
+        return result
+
+    def submit(self, message: str, scam_type: str, probability: int, highlights: list, on_result=None,
+               wait: float = 0.0):
+        # Breaker first: while it is open callers fall back at once instead
+        # of queueing for an admission permit they will not use.
+        if not self.breaker.allow():
+            self._count("breaker_open")
+            return None
+        permit = None
+        if self.admission is not None:
+            permit = self.admission.acquire(wait)
+            if permit is None:
+                self._count("shed")
+                self.breaker.cancel_trial()
+                return None
+        if not self._slots.acquire(blocking=False):
+            self._count("saturated")
+            self.breaker.cancel_trial()
+            if permit is not None:
+                permit.release()
+            return None
+
+        def release(done=None):
+            self._slots.release()
+            if permit is not None:
+                permit.release()
+            if done is None or done.cancelled():
+                self.breaker.cancel_trial()
+
+        try:
+            future = self._executor.submit(self._call, message, scam_type, probability, list(highlights))
+        except RuntimeError:
+            release()
+            return None
+        future.add_done_callback(release)
+        if on_result is not None:
+            def deliver(done):
+                result = done.result()
+                if result:
+                    on_result(result)
+
+            future.add_done_callback(deliver)
+        return future
+
+    def explain(self, message: str, scam_type: str, probability: int, highlights: list, on_result=None):
+        # on_result also fires for answers that arrive after the timeout.
+        future = self.submit(message, scam_type, probability, highlights, on_result=on_result,
+                             wait=self.queue_timeout)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count("timeout")
+            return None
+
+    async def aexplain(self, message: str, scam_type: str, probability: int, highlights: list, on_result=None):
+        # Awaited on the event loop in ASGI mode, so in-flight LLM calls cost
+        # a coroutine each rather than a worker thread.
+        if self._async_in_flight >= self.max_async:
+            self._count("saturated")
+            return None
+        if not self.breaker.allow():
+            self._count("breaker_open")
+            return None
+        permit = None
+        if self.admission is not None:
+            try:
+                permit = await self.admission.aacquire(self.queue_timeout)
+            except asyncio.CancelledError:
+                self.breaker.cancel_trial()
+                raise
+            if permit is None:
+                self._count("shed")
+                self.breaker.cancel_trial()
+                return None
+        self._async_in_flight += 1
+        try:
+            response = await asyncio.wait_for(
+                self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": build_prompt(message, scam_type, probability, highlights)}],
+                    max_tokens=400,
+                ),
+                timeout=self.timeout,
+            )
+            result = parse_explanation(response.choices[0].message.content)
+        except asyncio.CancelledError:
+            self.breaker.cancel_trial()
+            raise
+        except Exception as exc:
+            self.breaker.record_failure()
+            self._count("timeout" if isinstance(exc, asyncio.TimeoutError) else "error")
+            print(f"LLM ERROR: {exc}")
+            return None
+        finally:
+            self._async_in_flight -= 1
+            if permit is not None:
+                permit.release()
+        self.breaker.record_success()
+        self._count("ok")
+        if result and on_result is not None:
+            on_result(result)
+        return result
+
+    # ---------- Deferred explanations ----------
+    def defer(self, message: str, scam_type: str, probability: int, highlights: list, fallback: dict,
+              on_result=None) -> str:
+        explanation_id = uuid.uuid4().hex
+        future = self.submit(message, scam_type, probability, highlights, on_result=on_result)
+        with self._deferred_lock:
+            self._deferred[explanation_id] = (future, fallback, time.monotonic())
+            while len(self._deferred) > self.max_deferred:
+                self._deferred.popitem(last=False)
+        return explanation_id
+
+    def lookup(self, explanation_id: str, wait: float = 0.0):
+        with self._deferred_lock:
+            entry = self._deferred.get(explanation_id)
+        if entry is None:
+            return "unknown", None
+        future, fallback, submitted_at = entry
+        if future is None:
+            return "fallback", fallback
+        remaining = self.timeout - (time.monotonic() - submitted_at)
+        try:
+            result = future.result(timeout=max(0.0, min(wait, remaining)))
+        except FutureTimeout:
+            if remaining > 0:
+                return "pending", None
+            return "fallback", fallback
+        return ("ready", result) if result else ("fallback", fallback)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
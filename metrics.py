@@ -0,0 +1,206 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value) -> str:
+    return repr(float(value))
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ---------- Metric types ----------
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_format(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, (list(counts), total)) for k, (counts, total) in self._series.items())
+        for labelvalues, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_format(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}"
+
+
+# ---------- Spans ----------
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record_span(self.stage, time.perf_counter() - self.started, exc_type is not None)
+        return False
+
+
+# ---------- Registry ----------
+class Metrics:
+    """Process-local counters and latency histograms in Prometheus text format.
+
+    With ``enabled=False`` spans are a shared no-op context manager and
+    ``inc``/``observe`` return before touching any lock, so instrumented code
+    costs one attribute check per call. Values are per process: scrape each
+    worker (or run a single gunicorn worker with threads) for full coverage.
+    """
+
+    def __init__(self, enabled: bool = True, prefix: str = "coder_darji"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+        self._capture = threading.local()
+        self.requests = self.counter("http_requests_total", "HTTP requests handled.", ["endpoint", "method", "code"])
+        self.request_seconds = self.histogram("http_request_seconds", "HTTP request latency.", ["endpoint"])
+        self.stage_seconds = self.histogram("stage_seconds", "Latency of each analysis pipeline stage.", ["stage"])
+        self.errors = self.counter("stage_errors_total", "Exceptions raised inside a pipeline stage.", ["stage"])
+        self.explanations = self.counter(
+            "explanations_total", "Where the explanation text came from.", ["source"]
+        )
+        self.campaign_reuse = self.counter(
+            "campaign_reuse_total", "Verdicts served from a near-duplicate in the campaign index."
+        )
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        metric = Counter(f"{self.prefix}_{name}", help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(f"{self.prefix}_{name}", help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, name: str, help: str, kind: str, collect, labelname: str = None):
+        """Register a callback read at scrape time: ``collect()`` returns a
+        number, or a ``{label: number}`` dict when ``labelname`` is given."""
+        self._collectors.append((f"{self.prefix}_{name}", help, kind, collect, labelname))
+
+    def span(self, stage: str):
+        return _Span(self, stage) if self.enabled else NULL_SPAN
+
+    def record_span(self, stage: str, seconds: float, failed: bool = False):
+        captured = getattr(self._capture, "spans", None)
+        if captured is not None:
+            captured.append((stage, seconds, failed))
+            return
+        self.stage_seconds.observe(seconds, stage)
+        if failed:
+            self.errors.inc(stage)
+
+    @contextmanager
+    def capture(self):
+        """Collect this thread's spans instead of recording them.
+
+        Work run in a process pool returns the list to the parent, which
+        records it with ``replay``; the child's own metrics are never scraped.
+        """
+        previous = getattr(self._capture, "spans", None)
+        self._capture.spans = spans = []
+        try:
+            yield spans
+        finally:
+            self._capture.spans = previous
+
+    def replay(self, spans):
+        for stage, seconds, failed in spans:
+            self.record_span(stage, seconds, failed)
+
+    def inc(self, counter: Counter, *labelvalues, amount: float = 1.0):
+        if self.enabled:
+            counter.inc(*labelvalues, amount=amount)
+
+    def observe(self, histogram: Histogram, value: float, *labelvalues):
+        if self.enabled:
+            histogram.observe(value, *labelvalues)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help, kind, collect, labelname in self._collectors:
+            try:
+                value = collect()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if labelname is None:
+                lines.append(f"{name} {_format(value)}")
+            else:
+                for label, v in sorted(value.items()):
+                    lines.append(f'{name}{{{labelname}="{_escape(label)}"}} {_format(v)}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,231 @@
+"""Hinglish-aware hashed features.
+
+Text is NFKC-normalised and case-folded, Devanagari is transliterated to
+Latin, and common Hinglish spelling variation is folded ("aapka"/"apka",
+"paisaa"/"paisa"). Each token then yields a word feature plus character
+n-grams. All of them are hashed with CRC-32 into a fixed number of columns,
+so there is no vocabulary to grow or load. A column means the same thing in
+every retrain that uses the same ``n_features`` and ``ngram_range``.
+"""
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+import scipy.sparse as sp
+
+
+# ---------- Devanagari transliteration ----------
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o",
+}
+_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+# NFKC leaves nukta letters decomposed (they are composition exclusions).
+_NUKTA_CONSONANTS = {"क": "q", "ख": "kh", "ग": "g", "ज": "z", "ड": "r", "ढ": "rh", "फ": "f"}
+_NUKTA, _VIRAMA = "़", "्"
+_NASALS = {"ं": "n", "ँ": "n", "ः": "h"}
+
+
+def transliterate_devanagari(word: str) -> str:
+    """Hunterian-style romanisation with Hindi schwa deletion.
+
+    Each akshara becomes ``[consonant, vowel, inherent]``. The inherent "a"
+    is dropped at the end of a word and in the VC_CV context, scanning right
+    to left, so अपना -> apnaa and नमस्ते -> namaste.
+    """
+    units = []
+    i, n = 0, len(word)
+    while i < n:
+        ch = word[i]
+        if ch in _CONSONANTS:
+            consonant = _CONSONANTS[ch]
+            if i + 1 < n and word[i + 1] == _NUKTA:
+                consonant = _NUKTA_CONSONANTS.get(ch, consonant)
+                i += 1
+            nxt = word[i + 1] if i + 1 < n else ""
+            if nxt in _MATRAS:
+                units.append([consonant, _MATRAS[nxt], False])
+                i += 1
+            elif nxt == _VIRAMA:
+                units.append([consonant, "", False])
+                i += 1
+            else:
+                units.append([consonant, "a", True])
+        elif ch in _VOWELS:
+            units.append(["", _VOWELS[ch], False])
+        elif ch in _MATRAS:
+            units.append(["", _MATRAS[ch], False])
+        elif ch in _NASALS:
+            units.append([_NASALS[ch], "", False])
+        elif ch not in (_NUKTA, _VIRAMA):
+            units.append([ch, "", False])
+        i += 1
+    if len(units) > 1 and units[-1][2]:
+        units[-1][1] = ""
+    for k in range(len(units) - 2, 0, -1):
+        prev, unit, nxt = units[k - 1], units[k], units[k + 1]
+        if unit[2] and prev[1] and nxt[0] and nxt[1]:
+            unit[1] = ""
+    return "".join(consonant + vowel for consonant, vowel, _ in units)
+
+
+# ---------- Normalisation ----------
+TOKEN_RE = re.compile(r"(?:[^\W_]|[ऀ-ॿ])+")
+_DEVANAGARI_RE = re.compile(r"[ऀ-ॿ]")
+_REPEATS_RE = re.compile(r"([a-z])\1{2,}")
+_LONG_VOWELS_RE = re.compile(r"aa|ee|ii|oo|uu")
+_LONG_VOWELS = {"aa": "a", "ee": "i", "ii": "i", "oo": "u", "uu": "u"}
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if text.isascii():
+        return text
+    # Non-ASCII digits (Devanagari, full-width, ...) become 0-9.
+    return "".join(str(unicodedata.decimal(c)) if c.isdecimal() and not c.isascii() else c for c in text)
+
+
+@lru_cache(maxsize=65536)
+def fold_token(token: str) -> str:
+    """Phonetic key shared by the spelling variants of one Hinglish word."""
+    if _DEVANAGARI_RE.search(token):
+        token = transliterate_devanagari(token)
+    token = _REPEATS_RE.sub(r"\1", token)
+    return _LONG_VOWELS_RE.sub(lambda m: _LONG_VOWELS[m.group()], token)
+
+
+def tokenize(text: str):
+    """``(surface, key)`` pairs: the token as written and its folded form."""
+    return [(surface, fold_token(surface)) for surface in TOKEN_RE.findall(normalize_text(text))]
+
+
+# ---------- Hashed features ----------
+@lru_cache(maxsize=65536)
+def _key_columns(key: str, n_features: int, min_n: int, max_n: int) -> tuple:
+    features = ["w:" + key]
+    padded = f" {key} "
+    for size in range(min_n, max_n + 1):
+        features.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+        if size >= len(padded):
+            break
+    return tuple(zlib.crc32(f.encode("utf-8")) % n_features for f in features)
+
+
+class HashedTextVectorizer:
+    """Fixed-width TF-IDF over hashed word and ``char_wb`` n-gram features.
+
+    Mirrors ``TfidfVectorizer`` (smooth idf, optional sublinear tf, L2 norm)
+    so it drops into the same training and scoring code. The fitted state is
+    a single ``idf`` array of ``n_features`` floats.
+    """
+
+    hashed = True
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_range=(3, 5), sublinear_tf: bool = True,
+                 norm: str = "l2", min_df: int = 1):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.min_df = min_df
+        self.idf_ = None
+
+    def get_params(self) -> dict:
+        return {"n_features": self.n_features, "ngram_range": list(self.ngram_range),
+                "sublinear_tf": self.sublinear_tf, "norm": self.norm, "min_df": self.min_df}
+
+    def token_columns(self, text: str):
+        """``(surface, key)`` pairs and the feature columns each token emits."""
+        min_n, max_n = self.ngram_range
+        pairs = tokenize(text)
+        return pairs, [_key_columns(key, self.n_features, min_n, max_n) for _, key in pairs]
+
+    def feature_columns(self, text: str) -> set:
+        return set(chain.from_iterable(self.token_columns(text)[1]))
+
+    def _counts(self, docs):
+        data, indices, indptr = [], [], [0]
+        for doc in docs:
+            columns = np.fromiter(chain.from_iterable(self.token_columns(doc)[1]), dtype=np.int64)
+            unique, counts = np.unique(columns, return_counts=True)
+            indices.append(unique)
+            data.append(counts)
+            indptr.append(indptr[-1] + len(unique))
+        if not indices:
+            return np.empty(0), np.empty(0, dtype=np.int64), np.array(indptr)
+        return np.concatenate(data).astype(np.float64), np.concatenate(indices), np.array(indptr)
+
+    def fit(self, docs, y=None):
+        _, indices, indptr = self._counts(docs)
+        df = np.bincount(indices, minlength=self.n_features).astype(np.float64)
+        self.idf_ = np.log(len(indptr) / (1.0 + df)) + 1.0
+        if self.min_df > 1:
+            # Columns too rare to learn from are zeroed rather than removed,
+            # so indices stay the same.
+            self.idf_[df < self.min_df] = 0.0
+        return self
+
+    def transform(self, docs):
+        data, indices, indptr = self._counts(docs)
+        n_docs = len(indptr) - 1
+        if self.sublinear_tf:
+            data = np.log(data) + 1.0
+        if self.idf_ is not None:
+            data = data * self.idf_[indices]
+        if self.norm == "l2" and len(data):
+            rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+            norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n_docs))
+            norms[norms == 0] = 1.0
+            data = data / norms[rows]
+        X = sp.csr_matrix((data, indices.astype(np.int32), indptr.astype(np.int32)),
+                          shape=(n_docs, self.n_features))
+        X.eliminate_zeros()
+        return X
+
+    def fit_transform(self, docs, y=None):
+        docs = list(docs)
+        return self.fit(docs).transform(docs)
+
+
+def rank_tokens(vectorizer, text: str, indices, scores, top_k: int):
+    """Spread each column's contribution evenly over the tokens that emitted it.
+
+    Returns ``(surface, key, score)`` for the ``top_k`` tokens with a positive
+    total, so a hashed model still highlights words as the user wrote them.
+    """
+    pairs, per_token = vectorizer.token_columns(text)
+    indices = np.asarray(indices)
+    if not pairs or not len(indices):
+        return []
+    lengths = [len(columns) for columns in per_token]
+    columns = np.fromiter(chain.from_iterable(per_token), dtype=np.int64, count=sum(lengths))
+    owner = np.repeat(np.arange(len(pairs)), lengths)
+    unique, inverse, shares = np.unique(columns, return_inverse=True, return_counts=True)
+
+    order = np.argsort(indices, kind="stable")
+    sorted_indices, sorted_scores = indices[order], np.asarray(scores)[order]
+    pos = np.minimum(np.searchsorted(sorted_indices, unique), len(sorted_indices) - 1)
+    per_column = np.where(sorted_indices[pos] == unique, sorted_scores[pos], 0.0) / shares
+    per_token_score = np.bincount(owner, weights=per_column[inverse], minlength=len(pairs))
+
+    totals, keys = {}, {}
+    for (surface, key), score in zip(pairs, per_token_score.tolist()):
+        totals[surface] = totals.get(surface, 0.0) + score
+        keys.setdefault(surface, key)
+    ranked = sorted((item for item in totals.items() if item[1] > 0), key=lambda item: -item[1])[:top_k]
+    return [(surface, keys[surface], score) for surface, score in ranked]
@@ -0,0 +1,215 @@
+import csv
+import fcntl
+import json
+import math
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+
+# ---------- Feedback store ----------
+class FeedbackStore:
+    """Append-only SQLite log of labelled messages, shared by all workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS feedback ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL, label INTEGER NOT NULL,"
+            " source TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def add(self, message: str, label: int, source: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO feedback (message, label, source, created_at) VALUES (?, ?, ?, ?)",
+                (message, int(label), source, time.time()),
+            )
+        return cursor.lastrowid
+
+    def since(self, last_id: int, limit: int = 1000):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, message, label, source FROM feedback WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+            ).fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+
+def label_from_answers(questions, answers: dict):
+    # All four follow-ups answered "safe" -> ham; two or more red flags -> scam.
+    # Anything in between is too ambiguous to train on.
+    given = [(answers.get(q["id"], "") or "").lower().strip() for q in questions]
+    red_flags = sum(1 for q, ans in zip(questions, given) if ans and ans != q["safe_answer"])
+    if red_flags >= 2:
+        return 1
+    if red_flags == 0 and all(given):
+        return 0
+    return None
+
+
+# ---------- Hashed online model ----------
+def make_hashing_vectorizer(n_features: int) -> HashingVectorizer:
+    # Stateless, so the trainer and every worker derive identical columns
+    # without sharing a vocabulary.
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, ngram_range=(1, 2), norm="l2")
+
+
+class OnlineModel:
+    def __init__(self, coef, intercept: float, version: int, vectorizer: HashingVectorizer):
+        self.coef = coef
+        self.intercept = intercept
+        self.version = version
+        self.vectorizer = vectorizer
+
+    def probabilities(self, texts):
+        z = self.vectorizer.transform(texts) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def probability(self, text: str) -> float:
+        z = self.intercept + float((self.vectorizer.transform([text]) @ self.coef)[0])
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+
+class OnlineLearner:
+    """Incrementally updated SGD logistic model fed by the feedback store.
+
+    One process at a time (whoever holds ``train.lock``) runs ``partial_fit``
+    on new feedback and publishes the weights as ``.npy`` files; every worker
+    polls ``version.json`` and swaps the new weights in.
+    """
+
+    def __init__(self, state_dir: str, store: FeedbackStore, bootstrap_path: str = None,
+                 n_features: int = 2 ** 18, feedback_weight: float = 5.0, followup_weight: float = 1.0,
+                 batch_size: int = 512):
+        self.state_dir = state_dir
+        self.store = store
+        self.bootstrap_path = bootstrap_path
+        # Explicit labels come from token holders; follow-up answers are
+        # anonymous, so they count no more than one bootstrap example.
+        self.feedback_weight = feedback_weight
+        self.followup_weight = followup_weight
+        self.batch_size = batch_size
+        self.vectorizer = make_hashing_vectorizer(n_features)
+        self._current = None
+        self._thread = None
+        self._stop = threading.Event()
+        os.makedirs(state_dir, exist_ok=True)
+
+    @property
+    def current(self):
+        return self._current
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.state_dir, name)
+
+    # ---------- Serving side ----------
+    def refresh(self) -> bool:
+        try:
+            with open(self._path("version.json"), encoding="utf-8") as f:
+                published = json.load(f)
+        except FileNotFoundError:
+            return False
+        current = self._current
+        if current is not None and current.version == published["version"]:
+            return False
+        weights = np.load(self._path(f"weights-{published['version']}.npy"), mmap_mode="r")
+        self._current = OnlineModel(weights[:-1], float(weights[-1]), published["version"], self.vectorizer)
+        return True
+
+    # ---------- Trainer side ----------
+    def _bootstrap(self) -> SGDClassifier:
+        clf = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+        rows = []
+        if self.bootstrap_path and os.path.exists(self.bootstrap_path):
+            with open(self.bootstrap_path, encoding="latin-1", newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                rows = [(r[1], 1 if r[0] == "spam" else 0) for r in reader if len(r) >= 2]
+        rng = random.Random(42)
+        for _ in range(5):
+            rng.shuffle(rows)
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                clf.partial_fit(self.vectorizer.transform([m for m, _ in batch]), [y for _, y in batch], classes=[0, 1])
+        if not rows:
+            clf.partial_fit(self.vectorizer.transform([""]), [0], classes=[0, 1])
+        return clf
+
+    def _publish(self, clf: SGDClassifier, version: int, last_feedback_id: int):
+        weights = np.append(clf.coef_[0], clf.intercept_[0])
+        with open(self._path("weights.tmp"), "wb") as f:
+            np.save(f, weights)
+        os.replace(self._path("weights.tmp"), self._path(f"weights-{version}.npy"))
+        with open(self._path("checkpoint.pkl.tmp"), "wb") as f:
+            pickle.dump({"clf": clf, "version": version, "last_feedback_id": last_feedback_id}, f)
+        os.replace(self._path("checkpoint.pkl.tmp"), self._path("checkpoint.pkl"))
+        with open(self._path("version.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump({"version": version, "last_feedback_id": last_feedback_id, "published_at": time.time()}, f)
+        os.replace(self._path("version.json.tmp"), self._path("version.json"))
+        stale = self._path(f"weights-{version - 2}.npy")
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    def train_once(self) -> bool:
+        with open(self._path("train.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                with open(self._path("checkpoint.pkl"), "rb") as f:
+                    state = pickle.load(f)
+                clf, version, last_id = state["clf"], state["version"], state["last_feedback_id"]
+                published = False
+            except FileNotFoundError:
+                clf, version, last_id = self._bootstrap(), 1, 0
+                self._publish(clf, version, last_id)
+                published = True
+
+            rows = self.store.since(last_id, limit=self.batch_size)
+            if not rows:
+                return published
+            while rows:
+                clf.partial_fit(
+                    self.vectorizer.transform([r[1] for r in rows]),
+                    [r[2] for r in rows],
+                    sample_weight=[self.followup_weight if r[3] == "followup" else self.feedback_weight
+                                   for r in rows],
+                )
+                last_id = rows[-1][0]
+                rows = self.store.since(last_id, limit=self.batch_size)
+            self._publish(clf, version + 1, last_id)
+            return True
+
+    def start(self, interval: float):
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.train_once()
+                    self.refresh()
+                except Exception as exc:
+                    print(f"✗ Online learning step failed: {exc}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="online-learner", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,252 @@
+import asyncio
+import fcntl
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# ---------- Per-client token buckets ----------
+class TokenBucketLimiter:
+    """In-process token buckets: ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0):
+        """Return ``(allowed, retry_after_seconds)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+
+class SQLiteTokenBucketLimiter:
+    """Token buckets in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path: str, rate: float, burst: float, ttl: float = 3600.0):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._next_purge = 0.0
+
+    def acquire(self, key: str, cost: float = 1.0):
+        # Wall-clock time: monotonic clocks are not comparable across processes.
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (self.burst, now)
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                if now >= self._next_purge:
+                    self._conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.ttl,))
+                    self._next_purge = now + 60.0
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+
+def make_rate_limiter(per_minute: float, burst: float, backend: str = "memory", db_path: str = None):
+    if per_minute <= 0:
+        return None
+    if backend == "sqlite":
+        return SQLiteTokenBucketLimiter(db_path, per_minute / 60.0, burst)
+    return TokenBucketLimiter(per_minute / 60.0, burst)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, int(math.ceil(seconds))))
+
+
+# ---------- LLM admission control ----------
+class Permit:
+    __slots__ = ("_release",)
+
+    def __init__(self, release):
+        self._release = release
+
+    def release(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class _AdmissionBase:
+    """At most ``max_inflight`` permits; up to ``max_queue`` callers may wait
+    for one, everyone else is shed immediately."""
+
+    poll_interval = 0.01
+
+    def __init__(self, max_inflight: int, max_queue: int):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.admitted = 0
+        self.shed = 0
+        self.timeouts = 0
+
+    def _try_slot(self):
+        raise NotImplementedError
+
+    def _enter_queue(self):
+        raise NotImplementedError
+
+    def acquire(self, timeout: float = 0.0):
+        permit = self._try_slot()
+        if permit is None and timeout > 0:
+            ticket = self._enter_queue()
+            if ticket is not None:
+                deadline = time.monotonic() + timeout
+                try:
+                    while permit is None and time.monotonic() < deadline:
+                        time.sleep(self.poll_interval)
+                        permit = self._try_slot()
+                finally:
+                    ticket.release()
+                if permit is None:
+                    self.timeouts += 1
+        self._account(permit)
+        return permit
+
+    async def aacquire(self, timeout: float = 0.0):
+        permit = self._try_slot()
+        if permit is None and timeout > 0:
+            ticket = self._enter_queue()
+            if ticket is not None:
+                deadline = time.monotonic() + timeout
+                try:
+                    while permit is None and time.monotonic() < deadline:
+                        await asyncio.sleep(self.poll_interval)
+                        permit = self._try_slot()
+                finally:
+                    ticket.release()
+                if permit is None:
+                    self.timeouts += 1
+        self._account(permit)
+        return permit
+
+    def _account(self, permit):
+        if permit is None:
+            self.shed += 1
+        else:
+            self.admitted += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "queue_timeouts": self.timeouts,
+        }
+
+
+class AdmissionGate(_AdmissionBase):
+    """Per-process gate built on a lock and two counters."""
+
+    def __init__(self, max_inflight: int, max_queue: int):
+        super().__init__(max_inflight, max_queue)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waiting = 0
+
+    def _release_slot(self):
+        with self._lock:
+            self._inflight -= 1
+
+    def _try_slot(self):
+        with self._lock:
+            if self._inflight >= self.max_inflight:
+                return None
+            self._inflight += 1
+        return Permit(self._release_slot)
+
+    def _leave_queue(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def _enter_queue(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return None
+            self._waiting += 1
+        return Permit(self._leave_queue)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**super().stats(), "inflight": self._inflight, "waiting": self._waiting}
+
+
+class FileAdmissionGate(_AdmissionBase):
+    """Host-wide gate: every slot and queue place is an ``flock``-ed file.
+
+    Locks belong to open file descriptions, so threads and worker processes
+    compete alike, and a crashed worker's slots are released by the kernel.
+    """
+
+    def __init__(self, directory: str, max_inflight: int, max_queue: int):
+        super().__init__(max_inflight, max_queue)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _lock_one(self, prefix: str, count: int):
+        start = random.randrange(count) if count else 0
+        for i in range(count):
+            path = os.path.join(self.directory, f"{prefix}-{(start + i) % count}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+
+            def release(fd=fd):
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+            return Permit(release)
+        return None
+
+    def _try_slot(self):
+        return self._lock_one("slot", self.max_inflight)
+
+    def _enter_queue(self):
+        return self._lock_one("queue", self.max_queue)
+
+
+def make_admission_gate(max_inflight: int, max_queue: int, backend: str = "memory", directory: str = None):
+    if max_inflight <= 0:
+        return None
+    if backend == "file":
+        return FileAdmissionGate(directory, max_inflight, max_queue)
+    return AdmissionGate(max_inflight, max_queue)
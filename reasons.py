@@ -0,0 +1,255 @@
+import numpy as np
+
+
+# ---------- Word reason map ----------
+WORD_REASONS = {
+    # Urgency / pressure
+    "urgent": "Creates urgency to pressure quick action",
+    "immediately": "Pressures you to act without thinking",
+    "limited": "Fake scarcity to force fast decisions",
+    "expire": "Urgency tactic — fear of missing out",
+    "hurry": "Pressure tactic to bypass rational thinking",
+    "asap": "Urgency language to prevent you from thinking clearly",
+    "now": "Immediate action pressure — classic manipulation tactic",
+    "today": "Time pressure to force hasty decisions",
+    "deadline": "Artificial deadline to create panic",
+
+    # Money / rewards
+    "bonus": "Promise of extra money is a common lure",
+    "offer": "Vague offer language used to attract victims",
+    "prize": "Classic prize/lottery scam signal",
+    "won": "Fake winning claims to bait victims",
+    "free": "Too-good-to-be-true free offer tactic",
+    "cash": "Direct money mention to lure victims",
+    "reward": "Reward promises used as bait",
+    "earn": "Unrealistic earning claims attract victims",
+    "salary": "Fake salary promises in job scams",
+    "commission": "Common word in fake job/task scams",
+    "daily": "Promises of daily earnings — task/job scam signal",
+    "income": "Fake income promise to attract victims",
+    "payment": "Payment mention to build false legitimacy",
+    "refund": "Fake refund used to steal banking details",
+    "cashback": "Fake cashback to steal account info",
+    "money": "Direct money mention — financial scam signal",
+    "transfer": "Money transfer request — common in fraud",
+    "deposit": "Deposit request before receiving reward — scam tactic",
+    "withdrawal": "Withdrawal mention to make scam feel real",
+    "profit": "Profit promise — common in investment scams",
+    "investment": "Fake investment pitch — financial scam signal",
+    "guaranteed": "No legitimate offer guarantees returns",
+    "returns": "Guaranteed returns promise — investment scam signal",
+
+    # Numbers (often money amounts)
+    "200": "Specific amount used to make fake offer feel real",
+    "500": "Specific amount used to make fake offer feel real",
+    "800": "Money amount — common in fake job/task offers",
+    "1000": "Round number promise typical in task scams",
+    "5000": "Large amount promise used as bait",
+    "450": "Specific amount used to make fake offer feel credible",
+    "100": "Small amount to seem low-risk and enticing",
+    "2000": "Money amount — common bait in task/job scams",
+    "10000": "Large sum promise — high-value scam bait",
+
+    # Contact / communication
+    "contact": "Asking you to contact — may lead to info harvesting",
+    "whatsapp": "Moves conversation off-platform to avoid detection",
+    "telegram": "Unofficial channel — common in scam recruitment",
+    "click": "Directing to click a link — phishing risk",
+    "link": "External link — potential phishing page",
+    "call": "Unsolicited call request — social engineering risk",
+    "phone": "Phone number request or call — social engineering tactic",
+    "number": "Requesting a number — often used to escalate contact",
+    "reply": "Reply pressure — used to initiate scam conversation",
+    "pm": "Private message request — tries to move you off public channels",
+    "dm": "Direct message to avoid scrutiny — common scam tactic",
+    "text": "Text-based contact — used to initiate phishing chain",
+
+    # Account / credentials
+    "otp": "OTP request is a major red flag — never share",
+    "pin": "PIN request — banks never ask for this",
+    "password": "Password request — always a red flag",
+    "verify": "Fake verification used to steal credentials",
+    "kyc": "KYC used as a pretext to harvest identity info",
+    "account": "Account mention to build false legitimacy",
+    "login": "Login request outside official app is suspicious",
+    "access": "Requesting access to your account or device — major red flag",
+    "credentials": "Credential request — identity theft risk",
+    "details": "Asking for personal details — data harvesting attempt",
+    "information": "Requesting personal information — phishing signal",
+    "identity": "Identity-related request — potential ID fraud",
+    "bank": "Bank mention — financial phishing signal",
+    "card": "Card details request — payment fraud risk",
+    "cvv": "CVV request — banks never ask for this, always a scam",
+
+    # Apps / tech
+    "app": "App download request — could be malicious software",
+    "download": "Download request — risk of malware or spyware",
+    "install": "Install request — potential malicious app",
+    "apk": "APK install request — major red flag, bypasses app store safety",
+    "software": "Software install — could be used for remote access",
+    "remote": "Remote access request — scammers use this to control your device",
+
+    # Social engineering
+    "friend": "Impersonating a friend or mutual contact — social engineering",
+    "family": "Family impersonation — emotional manipulation tactic",
+    "help": "Fake help request — used to create emotional urgency",
+    "emergency": "Fake emergency to bypass rational thinking",
+    "trust": "Overemphasis on trust — common manipulation signal",
+    "safe": "False safety assurance to lower your guard",
+    "legit": "Overasserting legitimacy — scammers often do this",
+    "official": "Fake official claim — impersonation red flag",
+    "government": "Government impersonation — authority-based scam",
+    "winner": "Fake winner announcement — lottery/prize scam",
+    "selected": "Fake selection claim — lottery/job scam signal",
+    "congratulations": "Classic scam opener for prize/lottery fraud",
+    "exclusive": "Exclusivity claim to make victim feel special",
+    "special": "Special offer language — bait tactic",
+
+    # Job / task scams
+    "job": "Unsolicited job offer — common scam vector",
+    "hiring": "Fake hiring message to harvest personal data",
+    "task": "Task-based scam — victims paid small amounts first, then defrauded",
+    "training": "Fake training to make scam seem legitimate",
+    "apply": "Apply now pressure — fake job scam tactic",
+    "vacancy": "Fake vacancy listing — recruitment scam signal",
+    "interview": "Fake interview invite — used to harvest personal info",
+    "work": "Work from home or part-time work offer — scam signal",
+    "part": "Part-time offer language — task scam signal",
+    "home": "Work from home promise — common in task scams",
+
+    # Delivery scams
+    "parcel": "Fake parcel alert to steal delivery fees or info",
+    "delivery": "Fake delivery notification — phishing signal",
+    "shipment": "Fake shipment used to harvest personal details",
+    "customs": "Fake customs fee demand — common delivery scam",
+    "courier": "Fake courier message to steal payment details",
+    "package": "Fake package notification — delivery phishing",
+    "address": "Address request — identity or delivery scam signal",
+
+    # Generic scam language
+    "videos": "Vague task content (e.g. like videos) — task scam signal",
+    "hotels": "Vague task content (e.g. rate hotels) — task scam signal",
+    "survey": "Fake survey used to harvest personal info",
+    "subscription": "Fake subscription charge — billing scam signal",
+    "charge": "Unexpected charge claim — billing fraud tactic",
+    "cancel": "Cancel subscription urgency — billing scam pressure",
+    "activate": "Fake activation request — phishing tactic",
+    "confirm": "Confirmation request — used to verify active targets",
+    "update": "Fake update request — credential phishing signal",
+}
+
+PHRASE_REASONS = {
+    "work from home": "Work-from-home promise — classic task/job scam hook",
+    "part time": "Part-time offer language — task scam signal",
+    "verification code": "Asking for a verification code — account takeover attempt",
+    "login code": "Asking for a login code — account takeover attempt",
+    "verify your account": "Fake verification used to steal credentials",
+    "account suspended": "Fake suspension threat to force quick action",
+    "click link": "Directing to click a link — phishing risk",
+    "click here": "Directing to click a link — phishing risk",
+    "call now": "Unsolicited call request under time pressure",
+    "claim now": "Pressure to claim a fake prize immediately",
+    "act now": "Immediate action pressure — classic manipulation tactic",
+    "limited time": "Fake scarcity to force fast decisions",
+    "free entry": "Free competition entry — classic prize scam bait",
+    "guaranteed returns": "No legitimate offer guarantees returns",
+}
+
+NUMBER_REASON = "Specific number — possibly a fake money amount to seem credible"
+SHORT_TOKEN_REASON = "Short token flagged by model — may appear frequently in scam context"
+ACTION_WORD_REASON = "Action word associated with scam instructions in training data"
+DEFAULT_REASON = "Word statistically linked to scam patterns in training data"
+BLOCKLISTED_REASON = "Known scam infrastructure — listed in the local blocklist"
+SHORTLINK_REASON = "Shortened link hides the real destination"
+
+# (suffix, replacement) pairs tried in order to map inflected forms such as
+# "verified" or "payments" back onto a WORD_REASONS entry.
+_SUFFIX_RULES = [
+    ("ication", "y"),
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ies", "y"),
+    ("ied", "y"),
+    ("ing", ""),
+    ("ing", "e"),
+    ("ed", ""),
+    ("ed", "e"),
+    ("es", ""),
+    ("s", ""),
+]
+
+
+def stem_candidates(word: str):
+    for suffix, replacement in _SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            yield word[: -len(suffix)] + replacement
+
+
+def _heuristic_reason(w: str) -> str:
+    if w.isdigit():
+        return NUMBER_REASON
+    if len(w) <= 2:
+        return SHORT_TOKEN_REASON
+    if w.endswith("ing"):
+        return ACTION_WORD_REASON
+    return DEFAULT_REASON
+
+
+def _known_reason(w: str):
+    if w in WORD_REASONS:
+        return WORD_REASONS[w]
+    if w in PHRASE_REASONS:
+        return PHRASE_REASONS[w]
+    for candidate in stem_candidates(w):
+        if candidate in WORD_REASONS:
+            return WORD_REASONS[candidate]
+    return None
+
+
+def get_word_reason(word: str) -> str:
+    w = word.lower()
+    reason = _known_reason(w)
+    if reason is not None:
+        return reason
+    if " " in w:
+        # n-gram feature: explain it by its most telling known token.
+        for token in w.split():
+            reason = _known_reason(token)
+            if reason is not None:
+                return reason
+    return _heuristic_reason(w)
+
+
+# ---------- Reason index ----------
+class ReasonIndex:
+    """Reason ID for every vocabulary entry, resolved once at startup.
+
+    Each distinct reason string is stored once in ``reasons``; ``ids`` maps a
+    feature column to its position in that table.
+    """
+
+    def __init__(self, feature_names):
+        self.reasons = []
+        self._ids_by_reason = {}
+        for reason in [*WORD_REASONS.values(), *PHRASE_REASONS.values(),
+                       NUMBER_REASON, SHORT_TOKEN_REASON, ACTION_WORD_REASON, DEFAULT_REASON,
+                       BLOCKLISTED_REASON, SHORTLINK_REASON]:
+            self.intern(reason)
+        self.ids = np.fromiter((self.intern(get_word_reason(str(term))) for term in feature_names),
+                               dtype=np.int32, count=len(feature_names))
+
+    def intern(self, reason: str) -> int:
+        reason_id = self._ids_by_reason.get(reason)
+        if reason_id is None:
+            reason_id = self._ids_by_reason[reason] = len(self.reasons)
+            self.reasons.append(reason)
+        return reason_id
+
+    def reason_id(self, feature_index: int) -> int:
+        return int(self.ids[feature_index])
+
+    def text(self, reason_id: int) -> str:
+        return self.reasons[reason_id]
+
+    def table(self) -> dict:
+        return {str(i): reason for i, reason in enumerate(self.reasons)}
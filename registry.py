@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import namedtuple
+
+from artifacts import artifact_path, current_version
+
+
+ModelSnapshot = namedtuple("ModelSnapshot", ["version", "engine", "loaded_at"])
+
+
+# ---------- Model registry ----------
+class ModelRegistry:
+    """Holds the live scoring engine and swaps in new artifact versions.
+
+    New versions are loaded on the caller's (or watcher's) thread and published
+    with a single reference assignment, so requests always see either the old
+    or the new snapshot in full, never a mix.
+    """
+
+    def __init__(self, root: str, load_engine, fallback=None):
+        self.root = root
+        self.load_engine = load_engine
+        self.fallback = fallback
+        self.listeners = []
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def current(self):
+        return self._snapshot
+
+    @property
+    def engine(self):
+        snapshot = self._snapshot
+        return snapshot.engine if snapshot else None
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else None
+
+    def reload(self, force: bool = False) -> bool:
+        with self._reload_lock:
+            version = current_version(self.root)
+            if version is None:
+                if self._snapshot is not None or self.fallback is None:
+                    return False
+                version, engine = self.fallback()
+            elif force or self._snapshot is None or self._snapshot.version != version:
+                engine = self.load_engine(artifact_path(self.root, version))
+            else:
+                return False
+            snapshot = ModelSnapshot(version, engine, time.time())
+            self._snapshot = snapshot
+        for listener in self.listeners:
+            listener(snapshot)
+        return True
+
+    def start_watcher(self, interval: float):
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.reload():
+                        print(f"✓ Model reloaded: version {self.version}")
+                except Exception as exc:
+                    print(f"✗ Model reload failed, keeping version {self.version}: {exc}")
+
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
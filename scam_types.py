@@ -0,0 +1,51 @@
+import re
+
+
+# ---------- Scam-type rules ----------
+# Ordered by priority: when a message matches several categories the first
+# one listed wins.
+SCAM_TYPE_RULES = [
+    ("OTP / Verification Code Hijack", ["otp", "verification code", "login code"]),
+    ("KYC / Account Verification Phishing", ["kyc", "account suspended", "verify your account"]),
+    ("Recruitment / Task Scam", ["job", "hiring", "work from home", "task", "commission", "salary per day"]),
+    ("Delivery / Logistics Phishing", ["delivery", "parcel", "shipment", "customs", "courier"]),
+    ("Refund / Cashback Scam", ["refund", "cashback"]),
+    ("Lottery / Prize Scam", ["won", "lottery", "prize", "claim"]),
+]
+DEFAULT_SCAM_TYPE = "General Scam / Phishing"
+
+
+class ScamTypeMatcher:
+    """All rules compiled into one word-boundary regex, matched in one pass."""
+
+    def __init__(self, rules=SCAM_TYPE_RULES, default: str = DEFAULT_SCAM_TYPE):
+        self.default = default
+        self.categories = [category for category, _ in rules]
+        groups = []
+        for i, (_, keywords) in enumerate(rules):
+            # Longest first so "verify your account" beats any shorter prefix.
+            alternatives = sorted(keywords, key=len, reverse=True)
+            pattern = "|".join(r"\s+".join(map(re.escape, k.split())) for k in alternatives)
+            groups.append(f"(?P<r{i}>{pattern})")
+        # A trailing "s" keeps simple plurals ("tasks", "prizes") matching
+        # without letting "won" fire inside "wonderful". \b sits between "won"
+        # and "'t", so apostrophe suffixes are ruled out separately.
+        self.pattern = re.compile(r"\b(?:" + "|".join(groups) + r")s?\b(?!['’]\w)", re.IGNORECASE)
+
+    def match(self, message: str):
+        matches = []
+        seen = set()
+        best = None
+        for m in self.pattern.finditer(message):
+            rank = int(m.lastgroup[1:])
+            keyword = " ".join(m.group(m.lastgroup).lower().split())
+            if (rank, keyword) not in seen:
+                seen.add((rank, keyword))
+                matches.append({"category": self.categories[rank], "keyword": keyword})
+            if best is None or rank < best:
+                best = rank
+        category = self.categories[best] if best is not None else self.default
+        return category, matches
+
+    def classify(self, message: str) -> str:
+        return self.match(message)[0]
@@ -0,0 +1,245 @@
+"""Offline scanner for large message archives.
+
+Streams a CSV or JSONL file in chunks, scores each chunk in one vectorized
+pass with the same engine and highlight logic as ``/api/analyze/batch``, and
+writes results incrementally, so memory stays bounded by ``--chunk-size`` x
+``--jobs`` whatever the input size.
+
+    python scan.py archive.csv -o results.jsonl --jobs 4
+    python scan.py messages.jsonl --text-field body -o flagged.csv --explain
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# The scanner pins one model version for the whole run; no watcher needed.
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+os.environ.setdefault("ONLINE_LEARNING", "0")
+
+TEXT_COLUMNS = ("message", "text", "body", "content", "v2")
+OUTPUT_FIELDS = ["row", "id", "status", "probability", "risk_level", "scam_type", "is_uncertain",
+                 "model_version", "highlights", "entities"]
+EXPLANATION_FIELDS = ["scam_goal", "what_to_do", "how_to_avoid"]
+
+
+# ---------- Input ----------
+def detect_format(path: str, explicit: str = None) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def iter_rows(path: str, fmt: str, text_field: str = None, id_field: str = None, encoding: str = "utf-8"):
+    """Yield ``(row_number, id, text)``; rows without text yield an empty string."""
+    f = sys.stdin if path == "-" else open(path, encoding=encoding, errors="replace", newline="")
+    try:
+        if fmt == "jsonl":
+            field = text_field or "message"
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    yield n, None, ""
+                    continue
+                if not isinstance(entry, dict):
+                    yield n, None, entry if isinstance(entry, str) else ""
+                    continue
+                yield n, entry.get(id_field) if id_field else None, entry.get(field) or ""
+        else:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            lowered = [h.strip().lower() for h in header]
+            if text_field:
+                if text_field.lower() not in lowered:
+                    raise SystemExit(f"Column {text_field!r} not found in {path} (have: {', '.join(header)})")
+                text_idx = lowered.index(text_field.lower())
+            else:
+                text_idx = next((lowered.index(c) for c in TEXT_COLUMNS if c in lowered), None)
+                if text_idx is None:
+                    raise SystemExit(f"No text column in {path}; pass --text-field (have: {', '.join(header)})")
+            id_idx = lowered.index(id_field.lower()) if id_field and id_field.lower() in lowered else None
+            for n, row in enumerate(reader, 1):
+                text = row[text_idx] if len(row) > text_idx else ""
+                yield n, row[id_idx] if id_idx is not None and len(row) > id_idx else None, text
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def iter_chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------- Scoring (runs in the worker processes) ----------
+_snapshot = None
+
+
+def _init_worker(version: str):
+    global _snapshot
+    import app
+    from artifacts import artifact_path
+    from registry import ModelSnapshot
+
+    current = app.registry.current
+    if current is not None and current.version == version:
+        _snapshot = current
+    else:
+        engine = app.load_engine(artifact_path(app.app.config["ARTIFACTS_DIR"], version))
+        _snapshot = ModelSnapshot(version, engine, time.time())
+
+
+def scan_chunk(chunk, top_k: int):
+    import app
+
+    results = app.iter_analyze_batch([text for _, _, text in chunk], top_k=top_k, chunk_size=len(chunk),
+                                     snapshot=_snapshot)
+    out = []
+    for (row, row_id, _), result in zip(chunk, results):
+        result.pop("index", None)
+        result.pop("message", None)
+        out.append({"row": row, "id": row_id, **result})
+    return out
+
+
+# ---------- Optional LLM explanations ----------
+def explain_results(results, texts, pool):
+    import app
+
+    def explain(item):
+        result, text = item
+        if not result["status"] or result["status"] == "Likely Safe":
+            return result
+        llm = app.generate_llm_explanation(text, result["scam_type"], result["probability"], result["highlights"])
+        explanation = llm or app.fallback_explanation(result["status"])
+        for field in EXPLANATION_FIELDS:
+            result[field] = explanation.get(field, "")
+        return result
+
+    return list(pool.map(explain, zip(results, texts)))
+
+
+# ---------- Output ----------
+class ResultWriter:
+    def __init__(self, path: str, fmt: str, fields):
+        self.fmt = fmt
+        self.fields = fields
+        self.f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.f, fieldnames=fields, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, results):
+        for result in results:
+            if self.csv is not None:
+                row = dict(result)
+                row["highlights"] = " ".join(f"{w}:{s:.3f}" for w, s, *_ in result["highlights"])
+                row["entities"] = " ".join(
+                    f"{e['type']}:{e['value']}" + ("!" if e["blocklisted"] else "") for e in result.get("entities", [])
+                )
+                self.csv.writerow(row)
+            else:
+                self.f.write(json.dumps({k: result.get(k) for k in self.fields}, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+# ---------- CLI ----------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL message archive with the scam model.")
+    parser.add_argument("input", help="CSV or JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (.jsonl or .csv), - for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument("--text-field", help="column/field holding the message text")
+    parser.add_argument("--id-field", help="column/field copied to the output as 'id'")
+    parser.add_argument("--encoding", default="utf-8", help="input encoding (spam.csv is latin-1)")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (1 = score in-process)")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--model-version", help="artifact version to score with (default: CURRENT)")
+    parser.add_argument("--explain", action="store_true", help="add LLM explanations for non-safe messages")
+    parser.add_argument("--quiet", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import app
+
+    snapshot = app.registry.current
+    if snapshot is None:
+        raise SystemExit("Model is not loaded")
+    version = args.model_version or snapshot.version
+
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = detect_format(args.output, args.output_format) if args.output != "-" else (args.output_format or "jsonl")
+    fields = OUTPUT_FIELDS + (EXPLANATION_FIELDS if args.explain else [])
+    writer = ResultWriter(args.output, out_fmt, fields)
+
+    rows = iter_rows(args.input, in_fmt, args.text_field, args.id_field, args.encoding)
+    chunks = iter_chunks(rows, args.chunk_size)
+    llm_pool = ThreadPoolExecutor(max_workers=app.app.config["LLM_MAX_WORKERS"]) if args.explain else None
+
+    counts = Counter()
+    started = time.perf_counter()
+
+    def emit(chunk, results):
+        if llm_pool is not None:
+            results = explain_results(results, [text for _, _, text in chunk], llm_pool)
+        writer.write(results)
+        counts.update(r["status"] or "empty" for r in results)
+        if not args.quiet:
+            total = sum(counts.values())
+            print(f"\r{total} messages, {total / (time.perf_counter() - started):.0f}/s",
+                  end="", file=sys.stderr, flush=True)
+
+    try:
+        if args.jobs <= 1:
+            _init_worker(version)
+            for chunk in chunks:
+                emit(chunk, scan_chunk(chunk, args.top_k))
+        else:
+            # Keep at most two chunks per worker in flight and write in input order.
+            with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(version,)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(scan_chunk, chunk, args.top_k)))
+                    if len(pending) >= args.jobs * 2:
+                        done_chunk, future = pending.popleft()
+                        emit(done_chunk, future.result())
+                while pending:
+                    done_chunk, future = pending.popleft()
+                    emit(done_chunk, future.result())
+    finally:
+        writer.close()
+        if llm_pool is not None:
+            llm_pool.shutdown()
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - started
+        print(f"\nScanned {sum(counts.values())} messages in {elapsed:.1f}s with model {version}", file=sys.stderr)
+        for status, n in counts.most_common():
+            print(f"  {status:<20} {n}", file=sys.stderr)
+    return counts
+
+
+if __name__ == "__main__":
+    main()
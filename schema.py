@@ -0,0 +1,152 @@
+"""Versioned response schemas for the analyze endpoints.
+
+Schema 1 is the original response, with highlights as ``[word, score, reason]``
+triples. Schema 2 is the compact form. Reasons and follow-up questions become
+IDs into the document served by ``/api/static``, scores are rounded, and the
+message is not echoed back unless asked for. Either schema accepts ``fields``
+(group or field names) to trim the response.
+"""
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+SCHEMA_VERSIONS = (1, 2)
+
+FIELD_GROUPS = {
+    "verdict": ("status", "probability", "risk_level", "scam_type", "is_uncertain", "degraded", "model_version"),
+    "highlights": ("highlights",),
+    "explanation": ("scam_goal", "what_to_do", "how_to_avoid", "explanation_id"),
+    "followup": ("followup_questions",),
+    "signals": ("scam_signals",),
+    "entities": ("entities",),
+    "campaign": ("campaign",),
+    "message": ("message",),
+}
+ALL_FIELDS = tuple(field for group in FIELD_GROUPS.values() for field in group)
+COMPACT_DEFAULT_FIELDS = frozenset(ALL_FIELDS) - {"message"}
+EXPLANATION_FIELDS = frozenset(FIELD_GROUPS["explanation"])
+
+SCORE_DIGITS = 4
+
+
+# ---------- Request options ----------
+def parse_version(value) -> int:
+    if value in (None, ""):
+        return 1
+    try:
+        version = int(value)
+    except (TypeError, ValueError):
+        version = None
+    if version not in SCHEMA_VERSIONS:
+        raise ValueError(f"Unknown schema {value!r} (supported: {', '.join(map(str, SCHEMA_VERSIONS))})")
+    return version
+
+
+def parse_fields(value):
+    """``"verdict,highlights"`` or a list of group/field names -> set of fields, or ``None`` for all."""
+    if value in (None, "", []):
+        return None
+    names = value.split(",") if isinstance(value, str) else value
+    if not isinstance(names, list):
+        raise ValueError("'fields' must be a comma-separated string or a list")
+    fields = set()
+    for name in names:
+        name = str(name).strip()
+        if name in FIELD_GROUPS:
+            fields.update(FIELD_GROUPS[name])
+        elif name in ALL_FIELDS:
+            fields.add(name)
+        elif name:
+            raise ValueError(f"Unknown field {name!r} (groups: {', '.join(FIELD_GROUPS)})")
+    return frozenset(fields)
+
+
+def wants_explanation(fields) -> bool:
+    return fields is None or not EXPLANATION_FIELDS.isdisjoint(fields)
+
+
+# ---------- Rendering ----------
+def select_fields(result: dict, fields) -> dict:
+    if fields is None:
+        return result
+    return {key: value for key, value in result.items() if key in fields or key not in ALL_FIELDS}
+
+
+def compact_result(result: dict, fields=None, static_etag: str = None, header: bool = True) -> dict:
+    """Schema 2 rendering of an analysis built with ``reason_ids=True``.
+
+    Batch responses pass ``header=False`` and carry ``schema`` once at the top.
+    """
+    out = {}
+    if header:
+        out["schema"] = 2
+        if static_etag:
+            out["static"] = static_etag
+    for key in ALL_FIELDS:
+        if key not in result or key not in (fields if fields is not None else COMPACT_DEFAULT_FIELDS):
+            continue
+        value = result[key]
+        if key == "highlights":
+            value = [[word, round(score, SCORE_DIGITS), reason] for word, score, reason in value]
+        elif key == "followup_questions":
+            value = [q["id"] for q in value]
+        out[key] = value
+    if "index" in result:
+        out["index"] = result["index"]
+    return out
+
+
+def static_document(model_version: str, reasons: dict, followup_questions: list):
+    """Static content referenced by schema 2 responses and its ETag."""
+    document = {
+        "schema": 2,
+        "model_version": model_version,
+        "reasons": reasons,
+        "followup_questions": followup_questions,
+        "fields": {group: list(fields) for group, fields in FIELD_GROUPS.items()},
+        "highlight_layout": ["word", "score", "reason"],
+    }
+    raw = json.dumps(document, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return document, hashlib.sha1(raw).hexdigest()[:16]
+
+
+# ---------- Compression ----------
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "application/json", "text/html", "text/plain", "text/css", "application/javascript", "text/javascript",
+})
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def compress(body: bytes, accept_encoding: str, min_size: int = 1024, level: int = 6):
+    """Return ``(body, encoding)``; ``encoding`` is ``None`` when left as-is."""
+    if len(body) < min_size:
+        return body, None
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        # Brotli quality 0-11; map the gzip-style level onto the lower range,
+        # which is where it is still cheap enough to run per response.
+        return brotli.compress(body, quality=min(11, max(0, level - 2))), "br"
+    if "gzip" in accepted or "*" in accepted:
+        return gzip.compress(body, compresslevel=level, mtime=0), "gzip"
+    return body, None
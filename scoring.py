@@ -0,0 +1,153 @@
+import math
+import string
+
+import numpy as np
+
+from cache import fingerprint, normalize_message
+from multilingual import normalize_text, rank_tokens, tokenize
+from reasons import ReasonIndex, get_word_reason
+
+
+WORD_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+_PUNCTUATION = string.punctuation + "“”‘’…"
+
+
+# ---------- Scoring engine ----------
+class ScoringEngine:
+    """Class-1 probability and per-word contributions from one sparse row.
+
+    Everything that does not depend on the message (class-1 weights,
+    intercept, feature-name and reason tables) is resolved once at
+    construction, so a request only touches the non-zero entries of its own
+    TF-IDF row. Contributions are ``(word, score, reason_id)`` triples.
+
+    Hashed and character n-gram features are not words, so their
+    contributions are summed back onto the message's own tokens, which is
+    why those paths need the text as well as the row.
+    """
+
+    def __init__(self, model, vectorizer):
+        classes = list(model.classes_)
+        if 1 not in classes:
+            raise ValueError("Model does not contain class 1")
+        self.class1_index = classes.index(1)
+
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        intercept = np.asarray(model.intercept_, dtype=np.float64)
+        # Binary logistic regression stores a single row for classes_[1].
+        self.binary = coef.shape[0] == 1
+        if self.binary:
+            sign = 1.0 if self.class1_index == 1 else -1.0
+            self.weights = sign * coef[0]
+            self.intercept = float(sign * intercept[0])
+        else:
+            self.weights = coef[self.class1_index]
+            self.intercept = float(intercept[self.class1_index])
+
+        self.model = model
+        self.vectorizer = vectorizer
+        self.hashed = getattr(vectorizer, "hashed", False)
+        self.feature_names = None if self.hashed else vectorizer.get_feature_names_out()
+        # Character n-grams ("ree", " fre") mean nothing to a user, so char
+        # models credit them back to the words they came from, as hashed
+        # models do.
+        self.char_ngrams = getattr(vectorizer, "analyzer", None) in ("char", "char_wb")
+        if self.char_ngrams:
+            self._analyze = vectorizer.build_analyzer() if hasattr(vectorizer, "build_analyzer") else vectorizer.analyze
+            self._column = getattr(vectorizer, "vocabulary_", None) or vectorizer.vocabulary
+        self.by_token = self.hashed or self.char_ngrams
+        self.reason_index = ReasonIndex(() if self.by_token else self.feature_names)
+        # Lower-cased \w\w+ tokens are all a default word analyzer sees.
+        self.word_tokens = (
+            getattr(vectorizer, "analyzer", None) == "word"
+            and getattr(vectorizer, "lowercase", False)
+            and getattr(vectorizer, "strip_accents", None) is None
+            and getattr(getattr(vectorizer, "token_re", None), "pattern",
+                        getattr(vectorizer, "token_pattern", None)) == WORD_TOKEN_PATTERN
+        )
+
+    def fingerprint(self, text: str) -> str:
+        """Score-cache key: equal keys must give the same row and contributions."""
+        if self.hashed:
+            # Rows and highlights depend only on the tokens as written.
+            return fingerprint(" ".join(surface for surface, _ in tokenize(text)), normalize=False)
+        return fingerprint(text, normalize=self.word_tokens)
+
+    def contains(self, text: str, word: str) -> bool:
+        """Whether ``word`` (a highlight from some message) occurs in ``text``."""
+        if self.word_tokens:
+            # n-grams skip stop words, so check their words one by one.
+            tokens = set(normalize_message(text).split())
+            return all(part in tokens for part in word.split())
+        return word.casefold() in f" {normalize_text(text)} "
+
+    def transform(self, text: str):
+        return self.vectorizer.transform([text]).tocsr()
+
+    def probability(self, row) -> float:
+        if not self.binary:
+            return float(self.model.predict_proba(row)[0][self.class1_index])
+        z = self.intercept + float(np.dot(row.data, self.weights[row.indices]))
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+    def _rank(self, indices, scores, top_k: int):
+        positive = np.flatnonzero(scores > 0)
+        order = positive[np.argsort(-scores[positive], kind="stable")][:top_k]
+        reason_ids = self.reason_index.ids
+        return [
+            (str(self.feature_names[indices[i]]), float(scores[i]), int(reason_ids[indices[i]]))
+            for i in order
+        ]
+
+    def token_columns(self, text: str):
+        """Char-model counterpart of ``HashedTextVectorizer.token_columns``.
+
+        Each whitespace-separated word is analysed on its own, which is
+        exactly how ``char_wb`` builds its n-grams; ``char`` n-grams that
+        span two words are left unattributed.
+        """
+        pairs, per_token = [], []
+        for word in text.split():
+            surface = word.strip(_PUNCTUATION).lower()
+            if surface:
+                pairs.append((surface, surface))
+                per_token.append([c for c in map(self._column.get, self._analyze(word)) if c is not None])
+        return pairs, per_token
+
+    def _rank_tokens(self, text: str, indices, scores, top_k: int):
+        intern = self.reason_index.intern
+        source = self.vectorizer if self.hashed else self
+        return [
+            # Folding mangles English ("free" -> "fri"), so only
+            # transliterated tokens look their reason up by key.
+            (surface, score, intern(get_word_reason(surface if surface.isascii() else key)))
+            for surface, key, score in rank_tokens(source, text, indices, scores, top_k)
+        ]
+
+    def contributions(self, row, top_k: int = 8, text: str = None):
+        scores = row.data * self.weights[row.indices]
+        if self.by_token:
+            return self._rank_tokens(text or "", row.indices, scores, top_k)
+        return self._rank(row.indices, scores, top_k)
+
+    def score(self, text: str, top_k: int = 8):
+        row = self.transform(text)
+        return self.probability(row), self.contributions(row, top_k=top_k, text=text)
+
+    def score_batch(self, texts, top_k: int = 8):
+        if not texts:
+            return []
+        X = self.vectorizer.transform(texts).tocsr()
+        probas = self.model.predict_proba(X)[:, self.class1_index]
+        # Elementwise row * weights over the whole matrix at once; rows are
+        # then ranked independently from their own slice of the CSR arrays.
+        scores = X.data * self.weights[X.indices]
+        results = []
+        for i in range(X.shape[0]):
+            start, end = X.indptr[i], X.indptr[i + 1]
+            if self.by_token:
+                contribs = self._rank_tokens(texts[i], X.indices[start:end], scores[start:end], top_k)
+            else:
+                contribs = self._rank(X.indices[start:end], scores[start:end], top_k)
+            results.append((float(probas[i]), contribs))
+        return results
@@ -0,0 +1,78 @@
+import importlib
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_llm  # noqa: E402
+
+
+@pytest.fixture
+def fake_groq():
+    """Start fake_llm on a free port; ``start(delay=...)`` returns its base URL."""
+    servers = []
+
+    def start(delay: float = 0.0, fail_rate: float = 0.0) -> str:
+        server = fake_llm.serve(port=0, delay=delay, fail_rate=fail_rate)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    from train_model import load_data
+
+    data = load_data(os.path.join(ROOT, "spam.csv"))
+    return data["message"].tolist(), data["label"].to_numpy()
+
+
+@pytest.fixture(scope="session")
+def fit_model(corpus):
+    """``fit_model(vectorizer, limit=None)`` -> ``(model, vectorizer)`` trained on spam.csv."""
+    from sklearn.linear_model import LogisticRegression
+
+    messages, labels = corpus
+
+    def fit(vectorizer, limit: int = None):
+        X = vectorizer.fit_transform(messages[:limit])
+        return LogisticRegression(max_iter=1000).fit(X, labels[:limit]), vectorizer
+
+    return fit
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """``app`` imported against a fake Groq server and throwaway state files."""
+    state = tempfile.mkdtemp(prefix="app-test-")
+    server = fake_llm.serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        "GROQ_API_KEY": "test",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        "FEEDBACK_DB_PATH": os.path.join(state, "feedback.db"),
+        "FEEDBACK_TOKEN": "feedback-token",
+        "ADMIN_TOKEN": "admin-token",
+        "LLM_ADMISSION_DIR": os.path.join(state, "admission"),
+        "RATE_LIMIT_DB_PATH": os.path.join(state, "ratelimit.db"),
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "MODEL_WATCH_INTERVAL": "0",
+    })
+    yield importlib.import_module("app")
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,56 @@
+from ratelimit import TokenBucketLimiter
+
+
+SCAM = "Congratulations! You won 5000 cash prize, click link to claim now"
+
+
+def test_feedback_requires_token(client):
+    response = client.post("/api/feedback", json={"message": SCAM, "label": "safe"})
+    assert response.status_code == 403
+    response = client.post("/api/feedback", json={"message": SCAM, "label": "safe"},
+                           headers={"X-Feedback-Token": "wrong"})
+    assert response.status_code == 403
+
+
+def test_feedback_with_token(client):
+    response = client.post("/api/feedback", json={"message": SCAM, "label": "scam"},
+                           headers={"X-Feedback-Token": "feedback-token"})
+    assert response.status_code == 201
+    assert response.get_json()["feedback_id"]
+
+
+def test_feedback_is_rate_limited(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "rate_limiter", TokenBucketLimiter(rate=0.001, burst=1))
+    headers = {"X-Feedback-Token": "feedback-token"}
+    assert client.post("/api/feedback", json={"message": SCAM, "label": "scam"}, headers=headers).status_code == 201
+    response = client.post("/api/feedback", json={"message": SCAM, "label": "safe"}, headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+
+
+def test_explanation_wait_must_be_a_number(client):
+    response = client.get("/api/explanation/unknown?wait=abc")
+    assert response.status_code == 404
+    assert response.get_json()["state"] == "unknown"
+
+
+def test_pipeline_errors_return_the_empty_result(app_module, client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("scoring failed")
+
+    monkeypatch.setattr(app_module, "score_stage", broken)
+    message = "A message nobody has sent before 7d1f"
+    response = client.post("/api/analyze", json={"message": message})
+    assert response.status_code == 200
+    assert response.get_json()["status"] is None and response.get_json()["message"] == message
+    response = client.post("/api/analyze?schema=2", json={"message": message})
+    assert response.status_code == 200 and response.get_json()["schema"] == 2
+    assert client.post("/", data={"message": message}).status_code == 200
+
+
+def test_malformed_followup_answers_do_not_break_the_response(client):
+    response = client.post("/api/analyze", json={
+        "message": "Share the OTP to unlock your account", "followup_submitted": True, "followup_answers": ["a"],
+    })
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), dict)
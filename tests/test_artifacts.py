@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from artifacts import export_artifacts, load_artifacts
+from multilingual import HashedTextVectorizer
+from scoring import ScoringEngine
+
+
+EXTRA = ["", "   ", "FREE!!! entry 2 win £1000 cash", "naïve café résumé", "आपका खाता बंद, OTP भेजें"]
+
+
+@pytest.mark.parametrize("params", [
+    {"stop_words": "english"},
+    {"stop_words": "english", "ngram_range": (1, 2), "min_df": 2, "sublinear_tf": True},
+    {"analyzer": "char_wb", "ngram_range": (3, 5), "min_df": 2, "sublinear_tf": True},
+    {"analyzer": "char", "ngram_range": (2, 4), "min_df": 2, "strip_accents": "unicode"},
+], ids=["word", "word-bigrams", "char_wb", "char"])
+def test_mapped_artifacts_match_pickled_model(fit_model, corpus, tmp_path, params):
+    model, vectorizer = fit_model(TfidfVectorizer(**params), limit=1500)
+    export_artifacts(model, vectorizer, str(tmp_path))
+    mapped_model, mapped_vectorizer = load_artifacts(str(tmp_path))
+
+    texts = corpus[0][:2000] + EXTRA
+    expected, actual = vectorizer.transform(texts), mapped_vectorizer.transform(texts)
+    assert expected.shape == actual.shape
+    assert abs(expected - actual).max() < 1e-12
+    np.testing.assert_allclose(mapped_model.predict_proba(actual), model.predict_proba(expected), atol=1e-12)
+
+    pickled, mapped = ScoringEngine(model, vectorizer), ScoringEngine(mapped_model, mapped_vectorizer)
+    assert pickled.word_tokens == mapped.word_tokens
+    for text in texts[:50] + EXTRA:
+        p, contribs = pickled.score(text)
+        q, mapped_contribs = mapped.score(text)
+        assert q == pytest.approx(p, abs=1e-12)
+        assert [c[0] for c in mapped_contribs] == [c[0] for c in contribs]
+
+
+def test_hashed_artifacts_match_fitted_vectorizer(fit_model, corpus, tmp_path):
+    model, vectorizer = fit_model(HashedTextVectorizer(n_features=2 ** 16, min_df=2))
+    export_artifacts(model, vectorizer, str(tmp_path))
+    mapped_model, mapped_vectorizer = load_artifacts(str(tmp_path))
+
+    texts = corpus[0][:500] + EXTRA
+    expected, actual = vectorizer.transform(texts), mapped_vectorizer.transform(texts)
+    assert abs(expected - actual).max() < 1e-12
+    np.testing.assert_allclose(mapped_model.predict_proba(actual), model.predict_proba(expected), atol=1e-12)
@@ -0,0 +1,64 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import fake_llm
+
+
+@pytest.fixture(scope="module")
+def asgi_module(app_module):
+    import asgi
+
+    yield asgi
+    if asgi.app.pool is not None:
+        asgi.app.pool.shutdown(wait=False)
+
+
+def call(asgi_app, path: str, body: dict, query: str = ""):
+    messages = [{"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(event):
+        sent.append(event)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": query.encode(),
+             "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 5000)}
+    asyncio.run(asgi_app(scope, receive, send))
+    start, body_event = sent
+    headers = dict(start["headers"])
+    raw = body_event["body"]
+    if headers.get(b"content-encoding") == b"gzip":
+        raw = gzip.decompress(raw)
+    return start["status"], json.loads(raw)
+
+
+def test_analyze_explains_through_the_llm(asgi_module):
+    status, result = call(asgi_module.app, "/api/analyze",
+                          {"message": "URGENT! Your KYC is blocked, share the OTP sent to 98765 43210 to reactivate"})
+    assert status == 200
+    assert result["status"] is not None
+    assert result["scam_goal"] == fake_llm.CANNED_EXPLANATION["scam_goal"]
+    assert result["degraded"] is False
+
+
+def test_analyze_verdict_fields_skip_the_explanation(asgi_module):
+    status, result = call(asgi_module.app, "/api/analyze",
+                          {"message": "Claim your lottery prize now, send bank details to 98765 43210"},
+                          query="schema=2&fields=verdict")
+    assert status == 200
+    assert result["schema"] == 2
+    assert "probability" in result and "scam_goal" not in result and "highlights" not in result
+
+
+def test_analyze_errors_return_the_empty_result(app_module, asgi_module, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("scoring failed")
+
+    monkeypatch.setattr(app_module, "score_stage", broken)
+    status, result = call(asgi_module.app, "/api/analyze", {"message": "Another unseen message 81c2"})
+    assert status == 200 and result["status"] is None
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+
+MESSAGES = [
+    "Congratulations! You won 5000 cash prize, click link to claim now",
+    "Ok lar... Joking wif u oni...",
+    "URGENT: your account is blocked, share the OTP to 98765 43210",
+    "Are we still meeting for lunch tomorrow?",
+]
+
+
+def test_results_keep_input_order(client):
+    response = client.post("/api/analyze/batch", json={"messages": MESSAGES})
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["count"] == len(MESSAGES)
+    assert [r["index"] for r in payload["results"]] == list(range(len(MESSAGES)))
+    assert [r["message"] for r in payload["results"]] == MESSAGES
+
+
+def test_empty_and_non_string_entries_get_empty_results(client):
+    response = client.post("/api/analyze/batch", json={"messages": ["", 5, None, "  ", MESSAGES[0]]})
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results[:4]] == [None] * 4
+    assert all(r["message"] == "" for r in results[:4])
+    assert results[4]["status"] is not None
+
+
+@pytest.mark.parametrize("body", [{}, {"messages": "not a list"}])
+def test_messages_must_be_a_list(client, body):
+    assert client.post("/api/analyze/batch", json=body).status_code == 400
+
+
+def test_batch_size_limit(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "BATCH_MAX_MESSAGES", 2)
+    response = client.post("/api/analyze/batch", json={"messages": MESSAGES})
+    assert response.status_code == 413
+
+
+def test_stream_returns_one_json_line_per_message(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "BATCH_CHUNK_SIZE", 3)
+    response = client.post("/api/analyze/batch?stream=1", json={"messages": MESSAGES})
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["index"] for line in lines] == list(range(len(MESSAGES)))
+    plain = client.post("/api/analyze/batch", json={"messages": MESSAGES}).get_json()["results"]
+    assert lines == plain
+
+
+def test_batch_matches_single_message_scoring(app_module):
+    engine = app_module.registry.engine
+    for (p, contribs), message in zip(engine.score_batch(MESSAGES), MESSAGES):
+        single_p, single_contribs = engine.score(message)
+        assert p == pytest.approx(single_p, abs=1e-12)
+        assert [c[0] for c in contribs] == [c[0] for c in single_contribs]
+        assert [c[1] for c in contribs] == pytest.approx([c[1] for c in single_contribs], abs=1e-12)
+    assert engine.score_batch([]) == []
+
+
+def test_batch_route_matches_single_analysis(app_module, client):
+    batch = client.post("/api/analyze/batch", json={"messages": MESSAGES}).get_json()["results"]
+    for result, message in zip(batch, MESSAGES):
+        single = app_module.score_stage(message)
+        assert result["probability"] == single["probability"]
+        assert result["status"] == single["status"]
+        assert result["highlights"] == [list(h) for h in single["highlights"]]
@@ -0,0 +1,55 @@
+from campaigns import CampaignIndex, shingles
+
+
+EARN_800 = "Earn 800 daily from home! WhatsApp Priya at 9876543210 to join our task team today"
+EARN_900 = "Earn 900 daily from home! WhatsApp Priya at 9123456780 to join our task team today"
+LUNCH = "Hey are we still meeting for lunch tomorrow?"
+
+
+def test_numbers_are_masked_in_shingles():
+    assert shingles(EARN_800) == shingles(EARN_900)
+    assert shingles("") == set()
+
+
+def test_variants_join_one_campaign_and_unrelated_text_does_not():
+    index = CampaignIndex()
+    verdict = {"status": "Scam", "probability": 91}
+    first = index.add(EARN_800, verdict, model_version="v1")
+    assert index.add(EARN_900, verdict, model_version="v1") == first
+    assert index.add(LUNCH, {"status": "Safe"}, model_version="v1") != first
+
+    match = index.lookup(EARN_900, "v1")
+    assert match.campaign_id == first and match.reusable
+    assert not index.lookup(EARN_900, "v2").reusable
+    assert index.campaign(first)["size"] == 2
+
+
+def test_examples_mask_digits():
+    index = CampaignIndex()
+    campaign_id = index.add(EARN_800, {"status": "Scam"}, model_version="v1")
+    [example] = index.campaign(campaign_id)["examples"]
+    assert "9876543210" not in example and "##########" in example
+
+
+def test_capacity_evicts_oldest_entries():
+    index = CampaignIndex(capacity=2)
+    for i in range(5):
+        index.add(f"message number {i} about topic {'abcde'[i]} and nothing else {i * 7}", {}, model_version="v")
+    assert index.stats()["entries"] == 2
+
+
+def test_campaign_routes_need_admin_token(client):
+    assert client.get("/api/campaigns?min_size=1").status_code == 403
+    response = client.get("/api/campaigns?min_size=1", headers={"X-Admin-Token": "admin-token"})
+    assert response.status_code == 200
+    assert client.get("/api/campaigns/unknown", headers={"X-Admin-Token": "admin-token"}).status_code == 404
+
+
+def test_reused_verdict_only_highlights_words_in_the_message(client):
+    first = client.post("/api/analyze", json={"message": "URGENT call 09061701461 to claim your 800 prize now"})
+    assert "800" in [h[0] for h in first.get_json()["highlights"]]
+
+    reused = client.post("/api/analyze", json={"message": "URGENT call 09061701461 to claim your 900 prize now"})
+    result = reused.get_json()
+    assert result["campaign"]["reused"]
+    assert "800" not in [h[0] for h in result["highlights"]]
@@ -0,0 +1,63 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from cascade import Prefilter
+from metrics import Metrics
+from multilingual import HashedTextVectorizer
+from scoring import ScoringEngine
+
+
+@pytest.mark.parametrize("make_vectorizer", [
+    lambda: TfidfVectorizer(stop_words="english", sublinear_tf=True),
+    lambda: TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=2),
+    lambda: TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), min_df=2, sublinear_tf=True),
+    lambda: HashedTextVectorizer(n_features=2 ** 16),
+], ids=["word", "word-bigrams", "char_wb", "hashed"])
+def test_prefilter_bound_is_never_below_the_model(fit_model, corpus, make_vectorizer):
+    engine = ScoringEngine(*fit_model(make_vectorizer(), limit=2000))
+    prefilter = Prefilter(engine)
+    assert prefilter.supported
+    messages = corpus[0] + ["", "FREE!!!", "आपका खाता बंद"]
+    rows = engine.vectorizer.transform(messages).tocsr()
+    for i, message in enumerate(messages):
+        assert prefilter.upper_bound(message) >= engine.probability(rows[i]) - 1e-12, message
+
+
+@pytest.fixture
+def cascade_on(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "CASCADE_ENABLED", True)
+    monkeypatch.setitem(app_module.app.config, "CASCADE_CLEAR_BELOW", 0.99)
+    return app_module
+
+
+def test_tiers_are_counted_by_the_caller(cascade_on, client):
+    before = cascade_on.tier_stats.counts()
+    result = client.post("/api/analyze", json={"message": "see you at lunch 3e1a"}).get_json()
+    assert "tier" not in result
+    after = cascade_on.tier_stats.counts()
+    scored = sum(after.get(t, 0) - before.get(t, 0) for t in ("prefilter_cleared", "full_model"))
+    assert scored == 1
+
+
+def test_process_pool_tiers_reach_the_parent(cascade_on):
+    import asgi
+
+    before = cascade_on.tier_stats.counts().get("prefilter_cleared", 0)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        result = asyncio.run(asgi.analyze_message(pool, "ok see you at lunch then 5b7c"))
+    assert result["status"] is not None and "tier" not in result
+    assert cascade_on.tier_stats.counts().get("prefilter_cleared", 0) == before + 1
+
+
+def test_captured_spans_are_replayed():
+    metrics = Metrics()
+    with metrics.capture() as spans:
+        with metrics.span("transform"):
+            pass
+    assert [stage for stage, _, _ in spans] == ["transform"]
+    assert 'stage="transform"' not in metrics.render()
+    metrics.replay(spans)
+    assert 'stage_seconds_count{stage="transform"} 1' in metrics.render()
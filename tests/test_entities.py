@@ -0,0 +1,34 @@
+import pytest
+
+from entities import extract_entities
+
+
+def phones(message):
+    return [e.value for e in extract_entities(message) if e.kind == "phone"]
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("call +91 98765 43210 now", ["919876543210"]),
+    ("call 98765-43210", ["919876543210"]),
+    ("ring 09061701461 to claim", ["919061701461"]),
+    ("+44 7700 900123", ["447700900123"]),
+])
+def test_phone_shapes(message, expected):
+    assert phones(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "offer ends 2026-10-18",
+    "due on 18/10/2026",
+    "pay Rs 5000 1000 today",
+    "ref 1234567890",
+])
+def test_dates_and_amounts_are_not_phones(message):
+    assert phones(message) == []
+
+
+def test_urls_upi_and_shortlinks():
+    entities = extract_entities("pay refund.desk@ybl, see bit.ly/x1 or www.kyc-update.xyz/login")
+    assert [(e.kind, e.value) for e in entities] == [
+        ("upi", "refund.desk@ybl"), ("shortlink", "bit.ly"), ("domain", "kyc-update.xyz"),
+    ]
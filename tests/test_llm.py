@@ -0,0 +1,49 @@
+import time
+
+from llm import CircuitBreaker, ExplanationService
+
+
+HIGHLIGHTS = [("otp", 0.5, "asks for a one-time password")]
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_breaker_allows_one_trial_when_half_open():
+    breaker = half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_saturated_submit_hands_back_half_open_trial(fake_groq):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    service = ExplanationService("test", base_url=fake_groq(delay=0.3), timeout=2.0,
+                                 max_workers=1, max_pending=0, breaker=breaker)
+    try:
+        busy = service.submit("share your otp", "OTP Fraud", 90, HIGHLIGHTS)
+        assert busy is not None
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert service.submit("share your otp", "OTP Fraud", 90, HIGHLIGHTS) is None
+        assert service.stats()["outcomes"]["saturated"] == 1
+        assert breaker.allow(), "breaker kept the trial of a call that never ran"
+        breaker.cancel_trial()
+        assert busy.result(timeout=2.0) is not None
+    finally:
+        service.shutdown()
+
+
+def test_rejected_submit_hands_back_half_open_trial():
+    breaker = half_open_breaker()
+    service = ExplanationService("test", base_url="http://127.0.0.1:9", breaker=breaker)
+    service.shutdown()
+    assert service.submit("share your otp", "OTP Fraud", 90, HIGHLIGHTS) is None
+    assert breaker.allow()
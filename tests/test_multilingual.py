@@ -0,0 +1,53 @@
+import pytest
+
+from cache import fingerprint
+from campaigns import shingles
+from multilingual import HashedTextVectorizer, fold_token, transliterate_devanagari
+from scoring import ScoringEngine
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("अपना", "apnaa"),
+    ("नमस्ते", "namaste"),
+    ("खाता", "khaataa"),
+])
+def test_transliteration_deletes_schwa(word, expected):
+    assert transliterate_devanagari(word) == expected
+
+
+def test_spelling_variants_share_a_key():
+    assert fold_token("aapka") == fold_token("apka") == fold_token("आपका")
+    assert fold_token("paisaa") == fold_token("paisa")
+
+
+def test_hashed_columns_do_not_depend_on_training_data():
+    a = HashedTextVectorizer(n_features=2 ** 12).fit(["aapka khata band"])
+    b = HashedTextVectorizer(n_features=2 ** 12).fit(["something else entirely"])
+    assert a.feature_columns("khata") == b.feature_columns("khata")
+    assert a.transform(["आपका खाता"]).shape == (1, 2 ** 12)
+
+
+def test_devanagari_matras_are_not_punctuation():
+    assert fingerprint("आपका खाता बंद") != fingerprint("आपक खात बंद")
+    assert shingles("आपका खाता बंद") != shingles("आपक खात बंद")
+
+
+@pytest.fixture(scope="module")
+def hashed_engine(fit_model):
+    return ScoringEngine(*fit_model(HashedTextVectorizer(n_features=2 ** 16)))
+
+
+def test_hashed_engine_cache_key_follows_its_tokens(hashed_engine):
+    full, clipped = "आपका खाता बंद", "आपक खात बंद"
+    assert (hashed_engine.transform(full) != hashed_engine.transform(clipped)).nnz
+    assert hashed_engine.fingerprint(full) != hashed_engine.fingerprint(clipped)
+    assert hashed_engine.fingerprint("FREE!! entry") == hashed_engine.fingerprint("free entry")
+
+
+def test_hashed_highlights_use_the_words_as_written(hashed_engine):
+    message = "URGENT आपका खाता बंद, claim FREE prize now"
+    _, highlights = hashed_engine.score(message)
+    words = [word for word, _, _ in highlights]
+    assert words and all(hashed_engine.contains(message, word) for word in words)
+    [(_, batch)] = hashed_engine.score_batch([message])
+    assert batch == highlights
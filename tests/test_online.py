@@ -0,0 +1,46 @@
+from sklearn.linear_model import SGDClassifier
+
+from online import FeedbackStore, OnlineLearner, label_from_answers
+
+
+QUESTIONS = [
+    {"id": "q1", "safe_answer": "yes"}, {"id": "q2", "safe_answer": "yes"},
+    {"id": "q3", "safe_answer": "no"}, {"id": "q4", "safe_answer": "no"},
+]
+SAFE = {"q1": "yes", "q2": "yes", "q3": "no", "q4": "no"}
+
+
+def test_label_from_answers():
+    assert label_from_answers(QUESTIONS, SAFE) == 0
+    assert label_from_answers(QUESTIONS, {**SAFE, "q3": "yes", "q4": "yes"}) == 1
+    assert label_from_answers(QUESTIONS, {**SAFE, "q3": "yes"}) is None
+    assert label_from_answers(QUESTIONS, {"q1": "yes"}) is None
+
+
+def test_followup_rows_weigh_less_than_explicit_labels(tmp_path, monkeypatch):
+    store = FeedbackStore(str(tmp_path / "feedback.db"))
+    learner = OnlineLearner(str(tmp_path / "online"), store, n_features=2 ** 10)
+    assert learner.train_once()
+
+    weights = []
+    original = SGDClassifier.partial_fit
+
+    def spy(self, X, y, classes=None, sample_weight=None):
+        weights.extend(sample_weight)
+        return original(self, X, y, classes=classes, sample_weight=sample_weight)
+
+    monkeypatch.setattr(SGDClassifier, "partial_fit", spy)
+    store.add("win a free prize", 1, "explicit")
+    store.add("earn daily from home", 0, "followup")
+    assert learner.train_once()
+    assert weights == [5.0, 1.0]
+
+
+def test_followups_are_not_stored_without_online_learning(app_module, client):
+    assert app_module.online_learner is None
+    before = app_module.feedback_store.count()
+    response = client.post("/api/analyze", json={
+        "message": "Earn 900 daily, call 98765 43210", "followup_submitted": True, "followup_answers": SAFE,
+    })
+    assert response.status_code == 200
+    assert app_module.feedback_store.count() == before
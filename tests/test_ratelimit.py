@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+from werkzeug.datastructures import Headers
+
+from llm import CircuitBreaker, ExplanationService
+from ratelimit import AdmissionGate, FileAdmissionGate, SQLiteTokenBucketLimiter, TokenBucketLimiter
+
+
+# ---------- Token buckets ----------
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteTokenBucketLimiter(str(tmp_path / "ratelimit.db"), rate=1.0, burst=2)
+    return TokenBucketLimiter(rate=1.0, burst=2)
+
+
+def test_bucket_allows_burst_then_limits(limiter):
+    assert limiter.acquire("a") == (True, 0.0)
+    assert limiter.acquire("a")[0]
+    allowed, retry_after = limiter.acquire("a")
+    assert not allowed and 0 < retry_after <= 1.0
+    assert limiter.acquire("b")[0], "buckets are per client"
+
+
+def test_bucket_refills(limiter):
+    limiter.acquire("a", cost=2)
+    assert not limiter.acquire("a")[0]
+    time.sleep(1.05)
+    assert limiter.acquire("a")[0]
+
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    first, second = (SQLiteTokenBucketLimiter(path, rate=0.01, burst=1) for _ in range(2))
+    assert first.acquire("a")[0]
+    assert not second.acquire("a")[0]
+
+
+# ---------- Admission gates ----------
+@pytest.fixture(params=["memory", "file"])
+def make_gate(request, tmp_path):
+    if request.param == "file":
+        return lambda inflight, queue: FileAdmissionGate(str(tmp_path / "admission"), inflight, queue)
+    return AdmissionGate
+
+
+def test_gate_admits_up_to_max_inflight(make_gate):
+    gate = make_gate(2, 0)
+    permits = [gate.acquire(), gate.acquire()]
+    assert all(permits)
+    assert gate.acquire() is None
+    permits[0].release()
+    permits[0].release()  # idempotent
+    assert gate.acquire() is not None
+    assert gate.stats()["shed"] == 1
+
+
+def test_gate_queue_waits_for_a_released_slot(make_gate):
+    gate = make_gate(1, 1)
+    held = gate.acquire()
+    started = time.monotonic()
+    assert gate.acquire(timeout=0.05) is None
+    assert time.monotonic() - started >= 0.05
+    assert gate.stats()["queue_timeouts"] == 1
+
+    async def waiter():
+        return await gate.aacquire(timeout=1.0)
+
+    async def main():
+        task = asyncio.ensure_future(waiter())
+        await asyncio.sleep(0.05)
+        held.release()
+        return await task
+
+    assert asyncio.run(main()) is not None
+
+
+def test_full_queue_sheds_immediately():
+    gate = AdmissionGate(1, 0)
+    gate.acquire()
+    started = time.monotonic()
+    assert gate.acquire(timeout=1.0) is None
+    assert time.monotonic() - started < 0.5
+
+
+# ---------- Client keys and ordering ----------
+def test_client_key_uses_trusted_hops_from_the_right(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "RATE_LIMIT_KEY_HEADER", "X-Forwarded-For")
+    spoofed = Headers({"X-Forwarded-For": "1.2.3.4, 203.0.113.7"})
+    assert app_module.client_key(spoofed, "10.0.0.1") == "203.0.113.7"
+    monkeypatch.setitem(app_module.app.config, "RATE_LIMIT_TRUSTED_HOPS", 2)
+    assert app_module.client_key(spoofed, "10.0.0.1") == "1.2.3.4"
+    assert app_module.client_key(Headers({"X-Forwarded-For": "203.0.113.7"}), "10.0.0.1") == "10.0.0.1"
+    assert app_module.client_key(Headers(), "10.0.0.1") == "10.0.0.1"
+
+
+def test_open_breaker_falls_back_without_queueing():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    gate = AdmissionGate(1, 1)
+    held = gate.acquire()
+    service = ExplanationService("test", base_url="http://127.0.0.1:9", breaker=breaker,
+                                 admission=gate, queue_timeout=1.0)
+    try:
+        started = time.monotonic()
+        assert service.explain("share your otp", "OTP Fraud", 90, []) is None
+        assert asyncio.run(service.aexplain("share your otp", "OTP Fraud", 90, [])) is None
+        assert time.monotonic() - started < 0.5
+        assert service.stats()["outcomes"] == {"breaker_open": 2}
+    finally:
+        held.release()
+        service.shutdown()
+
+
+def test_shed_call_hands_back_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    gate = AdmissionGate(1, 0)
+    held = gate.acquire()
+    service = ExplanationService("test", base_url="http://127.0.0.1:9", breaker=breaker, admission=gate)
+    try:
+        assert service.submit("share your otp", "OTP Fraud", 90, []) is None
+        assert service.stats()["outcomes"] == {"shed": 1}
+        assert breaker.allow()
+    finally:
+        held.release()
+        service.shutdown()
+
+
+def test_admission_gate_is_the_only_bound_on_threaded_calls(fake_groq):
+    gate = AdmissionGate(2, 0)
+    service = ExplanationService("test", base_url=fake_groq(delay=0.3), timeout=2.0, max_workers=1,
+                                 max_pending=0, admission=gate)
+    try:
+        started = time.monotonic()
+        futures = [service.submit("share your otp", "OTP Fraud", 90, []) for _ in range(3)]
+        assert futures[2] is None and service.stats()["outcomes"] == {"shed": 1}
+        assert all(future.result(timeout=2.0) for future in futures[:2])
+        # Both admitted calls ran at once rather than one queueing behind the other.
+        assert time.monotonic() - started < 0.55
+    finally:
+        service.shutdown()
+
+
+def test_clients_are_keyed_by_forwarded_for_by_default(app_module):
+    assert app_module.app.config["RATE_LIMIT_KEY_HEADER"] == "X-Forwarded-For"
+    with app_module.app.test_request_context(headers={"X-Forwarded-For": "198.51.100.4"}):
+        from flask import request
+
+        assert app_module.client_key(request.headers, request.remote_addr) == "198.51.100.4"
@@ -0,0 +1,122 @@
+import os
+import time
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from artifacts import CURRENT_FILE, current_version, list_versions, publish_artifacts
+from registry import ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def models(fit_model):
+    """Two distinguishable fitted models to publish as versions."""
+    return [fit_model(TfidfVectorizer(stop_words="english"), limit=500),
+            fit_model(TfidfVectorizer(stop_words="english", ngram_range=(1, 2)), limit=500)]
+
+
+@pytest.fixture
+def make_registry(app_module, tmp_path):
+    root = str(tmp_path / "artifacts")
+    registries = []
+
+    def make(fallback=None):
+        registry = ModelRegistry(root, app_module.load_engine, fallback=fallback)
+        registries.append(registry)
+        return registry
+
+    yield root, make
+    for registry in registries:
+        registry.stop_watcher()
+
+
+def test_reload_swaps_to_the_current_version(models, make_registry):
+    root, make = make_registry
+    registry = make()
+    seen = []
+    registry.listeners.append(lambda snapshot: seen.append(snapshot.version))
+    assert not registry.reload() and registry.current is None
+
+    publish_artifacts(*models[0], root, version="v1")
+    assert registry.reload() and registry.version == "v1"
+    assert not registry.reload()
+    publish_artifacts(*models[1], root, version="v2")
+    assert registry.reload() and registry.version == "v2"
+    assert registry.reload(force=True)
+    assert seen == ["v1", "v2", "v2"]
+    assert registry.engine.feature_names is not None
+
+
+def test_fallback_only_without_artifacts(models, make_registry):
+    root, make = make_registry
+    registry = make(fallback=lambda: ("pickle", "engine"))
+    assert registry.reload() and registry.version == "pickle"
+    publish_artifacts(*models[0], root, version="v1")
+    assert registry.reload() and registry.version == "v1"
+
+
+def test_failed_load_keeps_serving_the_old_version(models, make_registry):
+    root, make = make_registry
+    registry = make()
+    publish_artifacts(*models[0], root, version="v1")
+    registry.reload()
+    broken = os.path.join(root, "v2")
+    os.makedirs(broken)
+    with open(os.path.join(broken, "meta.json"), "w") as f:
+        f.write('{"format_version": 99}')
+    with open(os.path.join(root, CURRENT_FILE), "w") as f:
+        f.write("v2\n")
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.version == "v1"
+
+
+def test_watcher_picks_up_a_published_version(models, make_registry):
+    root, make = make_registry
+    publish_artifacts(*models[0], root, version="v1")
+    registry = make()
+    registry.reload()
+    registry.start_watcher(0.02)
+    publish_artifacts(*models[1], root, version="v2")
+    deadline = time.monotonic() + 5
+    while registry.version != "v2" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert registry.version == "v2"
+
+
+def test_publish_prunes_old_versions(models, tmp_path):
+    root = str(tmp_path / "artifacts")
+    for i in range(5):
+        publish_artifacts(*models[0], root, version=f"v{i}", keep=2)
+    assert list_versions(root) == ["v2", "v3", "v4"]
+    assert current_version(root) == "v4"
+    assert not [name for name in os.listdir(root) if name.startswith(".")]
+
+
+def test_admin_reload_route(app_module, client, models, make_registry, monkeypatch):
+    root, make = make_registry
+    publish_artifacts(*models[0], root, version="v1")
+    publish_artifacts(*models[1], root, version="v2")
+    registry = make()
+    registry.reload()
+    monkeypatch.setattr(app_module, "registry", registry)
+    monkeypatch.setitem(app_module.app.config, "ARTIFACTS_DIR", root)
+    admin = {"X-Admin-Token": "admin-token"}
+
+    assert client.post("/api/admin/reload", json={"version": "v1"}).status_code == 403
+    assert client.post("/api/admin/reload", json={"version": "v1"},
+                       headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.post("/api/admin/reload", json={"version": "missing"}, headers=admin)
+    assert response.status_code == 404 and response.get_json()["model_version"] == "v2"
+    response = client.post("/api/admin/reload", json={"version": "../v1"}, headers=admin)
+    assert response.status_code == 404
+
+    response = client.post("/api/admin/reload", json={"version": "v1"}, headers=admin)
+    assert response.get_json() == {"reloaded": True, "model_version": "v1"}
+    assert current_version(root) == "v1"
+    model = client.get("/api/model").get_json()
+    assert model["model_version"] == "v1" and model["available_versions"] == ["v1", "v2"]
+    result = client.post("/api/analyze", json={"message": "You won a prize, claim now"}).get_json()
+    assert result["model_version"] == "v1"
+    batch = client.post("/api/analyze/batch", json={"messages": ["claim now"]}).get_json()
+    assert batch["model_version"] == "v1"
@@ -0,0 +1,34 @@
+import pytest
+
+from scam_types import DEFAULT_SCAM_TYPE, ScamTypeMatcher
+
+
+matcher = ScamTypeMatcher()
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Your OTP is 4821, share it to receive the refund", "OTP / Verification Code Hijack"),
+    ("Complete KYC today or your account suspended", "KYC / Account Verification Phishing"),
+    ("Part time job, earn by finishing simple tasks", "Recruitment / Task Scam"),
+    ("Your parcel is held at customs", "Delivery / Logistics Phishing"),
+    ("Cashback of Rs 500 credited, click to accept", "Refund / Cashback Scam"),
+    ("You WON a lottery, claim your prizes now", "Lottery / Prize Scam"),
+    ("Please   verify\nyour account", "KYC / Account Verification Phishing"),
+    ("I can multitask just fine", DEFAULT_SCAM_TYPE),
+    ("What a wonderful day", DEFAULT_SCAM_TYPE),
+    ("I won't come today", DEFAULT_SCAM_TYPE),
+    ("I won’t come today", DEFAULT_SCAM_TYPE),
+    ("", DEFAULT_SCAM_TYPE),
+])
+def test_classify(message, expected):
+    assert matcher.classify(message) == expected
+
+
+def test_match_reports_every_rule_once_in_order():
+    category, signals = matcher.match("Claim your prize: OTP 1234, otp expires soon, claim now")
+    assert category == "OTP / Verification Code Hijack"
+    assert signals == [
+        {"category": "Lottery / Prize Scam", "keyword": "claim"},
+        {"category": "Lottery / Prize Scam", "keyword": "prize"},
+        {"category": "OTP / Verification Code Hijack", "keyword": "otp"},
+    ]
@@ -0,0 +1,31 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from scoring import ScoringEngine
+
+
+def test_word_engine_shares_key_across_case_and_punctuation(fit_model):
+    engine = ScoringEngine(*fit_model(TfidfVectorizer(stop_words="english")))
+    assert engine.word_tokens
+    assert engine.fingerprint("FREE!!! entry") == engine.fingerprint("free entry")
+
+
+def test_char_engine_keys_on_raw_text(fit_model):
+    engine = ScoringEngine(*fit_model(TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5))))
+    assert not engine.word_tokens
+    shouted, plain = "FREE!!! entry", "free entry"
+    assert (engine.transform(shouted) != engine.transform(plain)).nnz
+    assert engine.fingerprint(shouted) != engine.fingerprint(plain)
+
+
+@pytest.mark.parametrize("params", [
+    {"analyzer": "char_wb", "ngram_range": (3, 5), "min_df": 2, "sublinear_tf": True},
+    {"analyzer": "char", "ngram_range": (2, 4), "min_df": 2},
+], ids=["char_wb", "char"])
+def test_char_engine_highlights_whole_words(fit_model, params):
+    engine = ScoringEngine(*fit_model(TfidfVectorizer(**params), limit=1500))
+    message = "FREE!!! entry: WIN a £1000 cash prize, txt CLAIM to 80086 now"
+    _, highlights = engine.score(message)
+    words = {word.strip("!:,").lower() for word in message.split()}
+    assert highlights and all(word in words for word, _, _ in highlights)
+    assert engine.score_batch([message])[0][1] == highlights
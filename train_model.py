@@ -1,31 +1,247 @@
-import pandas as pd
+import argparse
+import itertools
+import json
+import os
 import pickle
+import platform
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+
+from artifacts import export_artifacts, load_artifacts, publish_artifacts
+from multilingual import HashedTextVectorizer
+from scoring import ScoringEngine
+
+
+# ---------- Search space ----------
+WORD_VECTORIZERS = [
+    {"analyzer": "word", "stop_words": "english", "ngram_range": ngrams, "min_df": min_df, "sublinear_tf": sublinear}
+    for ngrams, min_df, sublinear in itertools.product([(1, 1), (1, 2)], [1, 2], [False, True])
+]
+CHAR_VECTORIZERS = [
+    {"analyzer": "char_wb", "ngram_range": (3, 5), "min_df": min_df, "sublinear_tf": True}
+    for min_df in [2, 5]
+]
+# Hinglish-aware, vocabulary-free: see multilingual.py.
+HASHED_VECTORIZERS = [
+    {"analyzer": "hashed", "ngram_range": ngrams, "min_df": min_df, "sublinear_tf": True}
+    for ngrams, min_df in itertools.product([(2, 4), (3, 5)], [1, 2])
+]
+CLASSIFIERS = [
+    {"solver": solver, "C": C}
+    for solver, C in itertools.product(["liblinear", "lbfgs"], [1.0, 10.0])
+]
+BASELINE = {
+    "vectorizer": {"analyzer": "word", "stop_words": "english"},
+    "classifier": {"solver": "lbfgs", "C": 1.0},
+}
+HASHED_BASELINE = {
+    "vectorizer": {"analyzer": "hashed", "ngram_range": (3, 5), "sublinear_tf": True},
+    "classifier": {"solver": "liblinear", "C": 10.0},
+}
+
+
+def build_candidates(include_char: bool = True, features: str = "vocab", hash_bits: int = 18):
+    vectorizers = []
+    if features in ("vocab", "all"):
+        vectorizers += WORD_VECTORIZERS + (CHAR_VECTORIZERS if include_char else [])
+    if features in ("hashed", "all"):
+        vectorizers += [dict(v, n_features=2 ** hash_bits) for v in HASHED_VECTORIZERS]
+    return [{"vectorizer": v, "classifier": c} for v, c in itertools.product(vectorizers, CLASSIFIERS)]
+
+
+def candidate_name(spec: dict) -> str:
+    v, c = spec["vectorizer"], spec["classifier"]
+    parts = [v["analyzer"], "ngram={}-{}".format(*v.get("ngram_range", (1, 1)))]
+    parts += [f"min_df={v.get('min_df', 1)}", f"sublinear={v.get('sublinear_tf', False)}"]
+    if v["analyzer"] == "hashed":
+        parts.append(f"n_features={v.get('n_features', 2 ** 18)}")
+    parts += [c["solver"], f"C={c['C']}"]
+    return " ".join(parts)
+
+
+def make_pipeline(spec: dict, seed: int):
+    params = dict(spec["vectorizer"])
+    if params.get("analyzer") == "hashed":
+        params.pop("analyzer")
+        vectorizer = HashedTextVectorizer(**params)
+    else:
+        vectorizer = TfidfVectorizer(**params)
+    model = LogisticRegression(max_iter=1000, random_state=seed, **spec["classifier"])
+    return vectorizer, model
+
+
+# ---------- Data ----------
+def load_data(path: str):
+    data = pd.read_csv(path, encoding="latin-1")
+    data = data[['v1', 'v2']]
+    data.columns = ['label', 'message']
+    data['label'] = data['label'].map({'ham': 0, 'spam': 1})
+    return data
+
+
+# ---------- Candidate evaluation (runs in the process pool) ----------
+_train = None
+
+
+def _init_worker(messages, labels):
+    global _train
+    _train = (np.asarray(messages, dtype=object), np.asarray(labels))
+
+
+def evaluate_candidate(spec: dict, folds: int, seed: int) -> dict:
+    messages, labels = _train
+    scores = []
+    for train_idx, val_idx in StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(messages, labels):
+        vectorizer, model = make_pipeline(spec, seed)
+        model.fit(vectorizer.fit_transform(messages[train_idx]), labels[train_idx])
+        scores.append(f1_score(labels[val_idx], model.predict(vectorizer.transform(messages[val_idx]))))
+
+    vectorizer, model = make_pipeline(spec, seed)
+    started = time.perf_counter()
+    model.fit(vectorizer.fit_transform(messages), labels)
+    fit_seconds = time.perf_counter() - started
+    return {
+        "spec": spec,
+        "cv_f1_mean": float(np.mean(scores)),
+        "cv_f1_std": float(np.std(scores)),
+        "fit_seconds": fit_seconds,
+        "fitted": (model, vectorizer),
+    }
+
+
+# ---------- Serving cost (runs in the parent, one candidate at a time) ----------
+def measure_serving_cost(model, vectorizer, sample, repeats: int = 3) -> dict:
+    # Export and score exactly the way app.py serves, so latency and size
+    # reflect the mapped artifacts rather than the in-memory sklearn objects.
+    out_dir = tempfile.mkdtemp(prefix="candidate-")
+    try:
+        export_artifacts(model, vectorizer, out_dir)
+        size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+        engine = ScoringEngine(*load_artifacts(out_dir))
+        timings = []
+        for _ in range(repeats):
+            for message in sample:
+                started = time.perf_counter()
+                engine.score(message)
+                timings.append(time.perf_counter() - started)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    timings_ms = np.array(timings) * 1000.0
+    return {
+        "artifact_bytes": size,
+        "latency_ms_p50": float(np.percentile(timings_ms, 50)),
+        "latency_ms_p95": float(np.percentile(timings_ms, 95)),
+    }
+
+
+def select_candidate(results, latency_budget_ms: float, max_artifact_mb: float = None):
+    def within_budget(r):
+        if r["latency_ms_p95"] > latency_budget_ms:
+            return False
+        return max_artifact_mb is None or r["artifact_bytes"] <= max_artifact_mb * 1024 * 1024
+
+    eligible = [r for r in results if within_budget(r)]
+    if not eligible:
+        print(f"! No candidate meets the {latency_budget_ms} ms p95 budget; picking the fastest.")
+        return min(results, key=lambda r: r["latency_ms_p95"])
+    return max(eligible, key=lambda r: (round(r["cv_f1_mean"], 4), -r["latency_ms_p95"]))
+
+
+# ---------- CLI ----------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the scam classifier and publish serving artifacts.")
+    parser.add_argument("--data", default="spam.csv")
+    parser.add_argument("--no-search", action="store_true", help="train only the baseline configuration")
+    parser.add_argument("--no-char", action="store_true", help="leave char n-gram vectorizers out of the search")
+    parser.add_argument("--features", choices=["vocab", "hashed", "all"], default="vocab",
+                        help="vocabulary TF-IDF, hashed Hinglish-aware features, or both")
+    parser.add_argument("--hash-bits", type=int, default=18, help="hashed feature space size as a power of two")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for the search")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-budget-ms", type=float, default=1.0, help="max p95 per-message scoring latency")
+    parser.add_argument("--max-artifact-mb", type=float, default=None)
+    parser.add_argument("--latency-sample", type=int, default=200, help="messages timed per candidate")
+    parser.add_argument("--report", default="training_report.json")
+    parser.add_argument("--artifacts-dir", default="artifacts")
+    parser.add_argument("--no-publish", action="store_true", help="do not write pickles or publish artifacts")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data = load_data(args.data)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data['message'], data['label'], test_size=0.2, random_state=args.seed
+    )
+
+    if args.no_search and args.features == "hashed":
+        hashed = dict(HASHED_BASELINE["vectorizer"], n_features=2 ** args.hash_bits)
+        candidates = [dict(HASHED_BASELINE, vectorizer=hashed)]
+    elif args.no_search:
+        candidates = [BASELINE]
+    else:
+        candidates = build_candidates(include_char=not args.no_char, features=args.features,
+                                      hash_bits=args.hash_bits)
+    print(f"Evaluating {len(candidates)} candidate(s) with {args.folds}-fold CV on {args.jobs} process(es)")
+
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                             initargs=(list(X_train), list(y_train))) as pool:
+        futures = [pool.submit(evaluate_candidate, spec, args.folds, args.seed) for spec in candidates]
+        results = [f.result() for f in futures]
+
+    sample = list(X_test[:args.latency_sample])
+    for result in results:
+        model, vectorizer = result["fitted"]
+        result.update(measure_serving_cost(model, vectorizer, sample))
+        result["test_f1"] = float(f1_score(y_test, model.predict(vectorizer.transform(X_test))))
+        print(f"  {candidate_name(result['spec']):<60} cv_f1={result['cv_f1_mean']:.4f} "
+              f"test_f1={result['test_f1']:.4f} fit={result['fit_seconds']:.2f}s "
+              f"p95={result['latency_ms_p95']:.3f}ms size={result['artifact_bytes'] / 1024:.0f}KiB")
 
-data = pd.read_csv("spam.csv", encoding="latin-1")
-data = data[['v1', 'v2']]
-data.columns = ['label', 'message']
-data['label'] = data['label'].map({'ham': 0, 'spam': 1})
+    best = select_candidate(results, args.latency_budget_ms, args.max_artifact_mb)
+    model, vectorizer = best["fitted"]
+    print(f"Selected: {candidate_name(best['spec'])}")
 
-X_train, X_test, y_train, y_test = train_test_split(
-    data['message'], data['label'], test_size=0.2, random_state=42
-)
+    y_pred = model.predict(vectorizer.transform(X_test))
+    print(accuracy_score(y_test, y_pred))
+    print(classification_report(y_test, y_pred))
 
-vectorizer = TfidfVectorizer(stop_words='english')
-X_train_vec = vectorizer.fit_transform(X_train)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "folds": args.folds,
+        "latency_budget_ms": args.latency_budget_ms,
+        "max_artifact_mb": args.max_artifact_mb,
+        "environment": {"python": platform.python_version(), "scikit-learn": sklearn.__version__},
+        "selected": candidate_name(best["spec"]),
+        "candidates": [
+            {"name": candidate_name(r["spec"]), **{k: v for k, v in r.items() if k != "fitted"}}
+            for r in results
+        ],
+    }
 
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train_vec, y_train)
+    if not args.no_publish:
+        pickle.dump(model, open("model.pkl", "wb"))
+        pickle.dump(vectorizer, open("vectorizer.pkl", "wb"))
+        report["published_version"] = publish_artifacts(model, vectorizer, args.artifacts_dir)
+        print(f"Model trained and saved (artifact version {report['published_version']}).")
 
-X_test_vec = vectorizer.transform(X_test)
-y_pred = model.predict(X_test_vec)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
 
-print(accuracy_score(y_test, y_pred))
-print(classification_report(y_test, y_pred))
 
-pickle.dump(model, open("model.pkl", "wb"))
-pickle.dump(vectorizer, open("vectorizer.pkl", "wb"))
-print("Model trained and saved.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()